@@ -1,28 +1,54 @@
-import os
 import logging
-from typing import List, Dict, Any
-import httpx
-from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, AsyncIterator, Optional
+from ..settings import get_settings
+from ..tracing import set_attributes, span
+from .json_stream import parse_elements
+from .key_pool import KeyPool, KeyPoolExhausted, get_key_pool, pool_from_settings
 
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
-HARVEST_API_KEY = os.getenv("HARVEST_API_KEY")
-HARVEST_BASE_URL = os.getenv("HARVEST_BASE_URL", "https://api.harvest-api.com")
+# Statuses about the key rather than the request: retry on another key
+KEY_REJECTED = (401, 403, 429)
 
 
 class HarvestClient:
-    def __init__(self) -> None:
-        if HARVEST_API_KEY:
-            # HarvestAPI uses X-API-Key header
-            self.headers = {
-                "X-API-Key": HARVEST_API_KEY,
-                "Content-Type": "application/json"
-            }
-        else:
-            self.headers = {}
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        pool: Optional[KeyPool] = None,
+    ) -> None:
+        settings = get_settings()
+        self.base_url = base_url or settings.harvest_base_url
+        # Clients share the process-wide pool (HARVEST_API_KEYS) unless given
+        # a key or pool of their own.
+        if pool is None:
+            pool = pool_from_settings([api_key]) if api_key else get_key_pool()
+        self.pool = pool
+
+    @staticmethod
+    def _headers(key: str) -> Dict[str, str]:
+        # HarvestAPI uses X-API-Key header
+        return {"X-API-Key": key, "Content-Type": "application/json"}
+
+    @asynccontextmanager
+    async def _get(self, client: Any, url: str, params: Dict[str, Any]) -> AsyncIterator[Any]:
+        """
+        Streamed GET on a pooled key. A 429 cools the key down and a 401/403
+        disables it; either way the request moves on to the next key.
+        Raises KeyPoolExhausted once every key has refused it.
+        """
+        for _ in range(len(self.pool)):
+            async with self.pool.lease() as lease:
+                set_attributes(key=lease.state.label, lane=lease.lane, queue_ms=round(lease.waited_ms, 1))
+                async with client.stream("GET", url, params=params, headers=self._headers(lease.key)) as r:
+                    if r.status_code in KEY_REJECTED:
+                        lease.reject(r.status_code, r.headers.get("Retry-After"))
+                        continue
+                    yield r
+                    return
+        raise KeyPoolExhausted(f"every Harvest key refused {url}")
 
     async def search_people(
         self,
@@ -40,11 +66,13 @@ class HarvestClient:
         - location: text-based location (fallback if geo_id is empty)
         - geo_id: preferred Harvest geoId for precise location
         """
-        if not HARVEST_API_KEY:
+        if not len(self.pool):
             logger.error("HARVEST_API_KEY missing")
             return []
 
-        url = f"{HARVEST_BASE_URL}/linkedin/profile-search"
+        import httpx  # deferred: keeps app import / worker cold start light
+
+        url = f"{self.base_url}/linkedin/profile-search"
         params: Dict[str, Any] = {"page": str(page)}
         if search:
             params["search"] = search
@@ -55,43 +83,57 @@ class HarvestClient:
         elif location:
             params["location"] = location
 
-        try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                r = await client.get(url, params=params, headers=self.headers)
-                logger.debug(f"Harvest API response: {r.status_code}")
-                r.raise_for_status()
-                data = r.json()
-                results = data.get("elements", [])[:limit]
-                logger.info(f"Harvest returned {len(results)} results", extra={
-                    'url': url, 'params': params, 'status': r.status_code
+        with span("harvest.search_people", page=page, title=title, geo_id=geo_id, search=search) as sp:
+            try:
+                async with httpx.AsyncClient(timeout=30) as client:
+                    async with self._get(client, url, params) as r:
+                        logger.debug(f"Harvest API response: {r.status_code}")
+                        sp.set(status=r.status_code)
+                        r.raise_for_status()
+                        body = await r.aread()
+                    # json.loads on the raw bytes, then keep only the fields we use
+                    results = parse_elements(body, limit)
+                    sp.set(result_count=len(results), latency_ms=round(sp.duration_ms, 1))
+                    logger.info(f"Harvest returned {len(results)} results", extra={
+                        'url': url, 'params': params, 'status': r.status_code,
+                        'result_count': len(results), 'latency_ms': round(sp.duration_ms, 1),
+                    })
+                    return results
+            except (httpx.HTTPStatusError, httpx.RequestError, ValueError, KeyPoolExhausted) as e:
+                sp.error = str(e)
+                sp.set(result_count=0, latency_ms=round(sp.duration_ms, 1))
+                logger.error(f"Harvest API error", extra={
+                    'url': url, 'params': params, 'error': str(e)
                 })
-                return results
-        except (httpx.HTTPStatusError, httpx.RequestError) as e:
-            logger.error(f"Harvest API error", extra={
-                'url': url, 'params': params, 'error': str(e)
-            })
-            return []
+                return []
 
     async def lookup_geo_id(self, search: str) -> str:
         """
         Resolve a text location into a geoId using /linkedin/geo-id-search.
         Example: "Lisbon" -> geoId "100509491"
         """
-        if not HARVEST_API_KEY:
+        if not len(self.pool):
             return ""
 
-        url = f"{HARVEST_BASE_URL}/linkedin/geo-id-search"
+        import httpx
+
+        url = f"{self.base_url}/linkedin/geo-id-search"
         params = {"search": search}
-        try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                r = await client.get(url, params=params, headers=self.headers)
-                logger.debug(f"GeoID lookup response: {r.status_code} for {search}")
-                r.raise_for_status()
-                data = r.json()
-                els = data.get("elements", [])
-                geo_id = els[0].get("geoId", "") if els else ""
-                logger.info(f"GeoID lookup: '{search}' -> '{geo_id}'")
-                return geo_id
-        except Exception as e:
-            logger.error(f"GeoID lookup failed for '{search}'", extra={'error': str(e)})
-            return ""
+        with span("harvest.lookup_geo_id", search=search) as sp:
+            try:
+                async with httpx.AsyncClient(timeout=30) as client:
+                    async with self._get(client, url, params) as r:
+                        logger.debug(f"GeoID lookup response: {r.status_code} for {search}")
+                        sp.set(status=r.status_code)
+                        r.raise_for_status()
+                        await r.aread()
+                    data = r.json()
+                    els = data.get("elements", [])
+                    geo_id = els[0].get("geoId", "") if els else ""
+                    sp.set(geo_id=geo_id, result_count=len(els), latency_ms=round(sp.duration_ms, 1))
+                    logger.info(f"GeoID lookup: '{search}' -> '{geo_id}'")
+                    return geo_id
+            except Exception as e:
+                sp.error = str(e)
+                logger.error(f"GeoID lookup failed for '{search}'", extra={'error': str(e)})
+                return ""
@@ -0,0 +1,371 @@
+import time
+import heapq
+import asyncio
+import itertools
+import logging
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+INF = float("inf")
+
+# Scheduling lanes: "<class>" or "<class>:<user>". The class sets the weight;
+# its users share it round-robin.
+DEFAULT_WEIGHTS = {"interactive": 8.0, "batch": 2.0, "scheduled": 1.0}
+
+_lane: ContextVar[str] = ContextVar("harvest_lane", default="interactive")
+
+
+@contextmanager
+def harvest_lane(lane: str) -> Iterator[None]:
+    """Run Harvest calls made in this context (and tasks it spawns) in `lane`."""
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane() -> str:
+    return _lane.get()
+
+
+class KeyPoolExhausted(Exception):
+    """No key can take a request: none configured, all rejected, or none free in time."""
+
+
+@dataclass
+class KeyState:
+    key: str
+    max_in_flight: int = 4
+    rate: float = 0.0               # requests/second; 0 = unlimited
+    burst: float = 1.0
+    quota: int = 0                  # requests per quota_window; 0 = unlimited
+    quota_window: float = 86400.0
+    tokens: float = 0.0
+    updated: float = 0.0
+    window_start: float = 0.0
+    used: int = 0
+    in_flight: int = 0
+    cooldown_until: float = 0.0
+    auth_failed: bool = False       # cooling down after 401/403 (until reset or cooldown ends)
+    requests: int = 0
+    throttled: int = 0
+    auth_failures: int = 0
+
+    @property
+    def label(self) -> str:
+        """Safe to log: never the full key."""
+        return f"...{self.key[-4:]}"
+
+    def refill(self, now: float) -> None:
+        if now - self.window_start >= self.quota_window:
+            self.window_start, self.used = now, 0
+        if self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready_at(self, now: float) -> float:
+        """Earliest time a request may start on this key, ignoring in-flight limits."""
+        t = max(now, self.cooldown_until)
+        if self.quota and self.used >= self.quota:
+            t = max(t, self.window_start + self.quota_window)
+        if self.rate and self.tokens < 1:
+            t = max(t, now + (1 - self.tokens) / self.rate)
+        return t
+
+    def describe(self, now: float) -> Dict[str, Any]:
+        return {
+            "key": self.label,
+            "in_flight": self.in_flight,
+            "used": self.used,
+            "quota": self.quota or None,
+            "cooldown_seconds": round(max(0.0, self.cooldown_until - now), 1),
+            "disabled": self.auth_failed and self.cooldown_until > now,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "auth_failures": self.auth_failures,
+        }
+
+
+@dataclass
+class Lease:
+    """A key granted to one request. Report 429/401/403 with reject()."""
+    pool: "KeyPool" = field(repr=False)
+    state: KeyState = field(repr=False)
+    lane: str = "interactive"
+    waited_ms: float = 0.0
+
+    @property
+    def key(self) -> str:
+        return self.state.key
+
+    def reject(self, status: int, retry_after: Optional[str] = None) -> None:
+        self.pool.reject(self.state, status, retry_after)
+
+
+class KeyPool:
+    """
+    Spreads Harvest requests over several API keys.
+
+    Each key has an in-flight limit, an optional token-bucket rate and an
+    optional request quota per window, tracked locally. A key answering 429
+    cools down (Retry-After, else `cooldown` seconds). A 401/403 takes it
+    out for `auth_cooldown` seconds, or until reset() brings it back, so one
+    transient auth error cannot shrink the pool for good.
+
+    Waiting requests are granted keys by hierarchical fair queuing. Lane
+    classes compete by start-time fair queuing on their weights: a class
+    with weight 8 gets ~4x the grants of a class with weight 2 while both
+    are backlogged, and an idle class cannot bank credit. So a large batch
+    job queues behind interactive searches instead of starving them, yet
+    still progresses. A grant won by a class goes round-robin to its users
+    ("<class>:<user>" lanes), so sending more user names does not buy a
+    bigger share, and one busy user cannot starve the others in the class.
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[str],
+        max_in_flight: int = 4,
+        rate: float = 0.0,
+        burst: Optional[float] = None,
+        quota: int = 0,
+        quota_window: float = 86400.0,
+        cooldown: float = 30.0,
+        auth_cooldown: float = 3600.0,
+        queue_timeout: float = 60.0,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> None:
+        now = time.monotonic()
+        self.keys = [
+            KeyState(k, max(1, max_in_flight), rate, burst or max(1.0, rate), quota, quota_window,
+                     tokens=burst or max(1.0, rate), updated=now, window_start=now)
+            for k in dict.fromkeys(k.strip() for k in keys) if k
+        ]
+        self.cooldown = cooldown
+        self.auth_cooldown = auth_cooldown
+        self.queue_timeout = queue_timeout
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        # class tags (finish, seq, start, class), one per queued request
+        self._waiting: List[Tuple[float, int, float, str]] = []
+        # class -> user -> queued futures; user order is the round-robin order
+        self._queues: Dict[str, "OrderedDict[str, Deque[asyncio.Future]]"] = {}
+        self._finish: Dict[str, float] = {}
+        self._vtime = 0.0
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def weight(self, lane: str) -> float:
+        return self.weights.get(lane.split(":", 1)[0], 1.0)
+
+    @asynccontextmanager
+    async def lease(self, lane: Optional[str] = None) -> AsyncIterator[Lease]:
+        """Wait for a key (fair across lanes) and hold it for one request."""
+        lane = lane or current_lane()
+        if not self.keys:
+            raise KeyPoolExhausted("no Harvest API keys configured")
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        cls, _, user = lane.partition(":")
+        self._queues.setdefault(cls, OrderedDict()).setdefault(user, deque()).append(fut)
+        start = max(self._vtime, self._finish.get(cls, 0.0))
+        finish = start + 1.0 / self.weight(cls)
+        self._finish[cls] = finish
+        heapq.heappush(self._waiting, (finish, next(self._seq), start, cls))
+        t0 = time.monotonic()
+        self._dispatch()
+        try:
+            state = await asyncio.wait_for(fut, self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise KeyPoolExhausted(f"no Harvest key free within {self.queue_timeout}s")
+        except BaseException:
+            # cancelled after a key was granted: hand it back
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                self._release(fut.result())
+            raise
+        try:
+            yield Lease(self, state, lane, (time.monotonic() - t0) * 1000)
+        finally:
+            self._release(state)
+
+    def reject(self, state: KeyState, status: int, retry_after: Optional[str] = None) -> None:
+        now = time.monotonic()
+        if status in (401, 403):
+            state.auth_failed = True
+            state.auth_failures += 1
+            state.cooldown_until = max(state.cooldown_until, now + self.auth_cooldown)
+            logger.error(f"Harvest key {state.label} rejected ({status}); "
+                         f"disabled for {self.auth_cooldown:.0f}s or until reset")
+        else:
+            try:
+                wait = float(retry_after) if retry_after else self.cooldown
+            except ValueError:
+                wait = self.cooldown
+            state.cooldown_until = max(state.cooldown_until, now + wait)
+            state.throttled += 1
+            logger.warning(f"Harvest key {state.label} throttled ({status}); cooling down {wait:.0f}s")
+
+    def reset(self, label: Optional[str] = None) -> List[str]:
+        """
+        Clear cooldowns (auth or throttling) on every key, or on the key whose
+        label (last four characters) is `label`. Returns the labels reset.
+        """
+        done = []
+        for k in self.keys:
+            if label is not None and k.label != label and k.key[-4:] != label:
+                continue
+            k.cooldown_until, k.auth_failed = 0.0, False
+            done.append(k.label)
+        if done:
+            logger.info(f"Harvest keys reset: {', '.join(done)}")
+            self._dispatch()
+        return done
+
+    def describe(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        waiting: Dict[str, int] = {}
+        for cls, users in self._queues.items():
+            for user, queue in users.items():
+                n = sum(1 for fut in queue if not fut.done())
+                if n:
+                    waiting[f"{cls}:{user}" if user else cls] = n
+        return {
+            "keys": [k.describe(now) for k in self.keys],
+            "waiting": waiting,
+            "weights": self.weights,
+        }
+
+    def _release(self, state: KeyState) -> None:
+        state.in_flight -= 1
+        self._dispatch()
+
+    def _pick(self, now: float) -> Optional[KeyState]:
+        best = None
+        for k in self.keys:
+            k.refill(now)
+            if k.in_flight >= k.max_in_flight or k.ready_at(now) > now:
+                continue
+            # least loaded, then least quota used
+            if best is None or (k.in_flight, k.used) < (best.in_flight, best.used):
+                best = k
+        return best
+
+    def _live(self, cls: str) -> bool:
+        """Drop timed-out or cancelled waiters of `cls`; True if any are left."""
+        users = self._queues.get(cls)
+        while users:
+            user, queue = next(iter(users.items()))
+            while queue and queue[0].done():
+                queue.popleft()
+            if queue:
+                return True
+            del users[user]
+        self._queues.pop(cls, None)
+        return False
+
+    def _take(self, cls: str) -> asyncio.Future:
+        """Next waiter of `cls`, round-robin over its users (call after _live)."""
+        users = self._queues[cls]
+        user, queue = next(iter(users.items()))
+        fut = queue.popleft()
+        if queue:
+            users.move_to_end(user)
+        else:
+            del users[user]
+            if not users:
+                del self._queues[cls]
+        return fut
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self._waiting:
+            finish, _, start, cls = self._waiting[0]
+            if not self._live(cls):     # every waiter timed out or was cancelled
+                heapq.heappop(self._waiting)
+                continue
+            state = self._pick(now)
+            if state is None:
+                break
+            heapq.heappop(self._waiting)
+            fut = self._take(cls)
+            self._vtime = start
+            state.in_flight += 1
+            state.used += 1
+            state.requests += 1
+            if state.rate:
+                state.tokens -= 1
+            fut.set_result(state)
+        if len(self._finish) > 1024:   # classes at or behind virtual time carry no state
+            self._finish = {cls: f for cls, f in self._finish.items() if f > self._vtime}
+        if not self._waiting:
+            return
+
+        # Nothing free: either a release will wake us, or a key frees up later.
+        if any(k.in_flight for k in self.keys):
+            next_at = min((k.ready_at(now) for k in self.keys if k.in_flight < k.max_in_flight), default=INF)
+        else:
+            next_at = min(k.ready_at(now) for k in self.keys)
+            if next_at - now > self.queue_timeout:
+                self._fail_waiting(KeyPoolExhausted(
+                    f"all Harvest keys rejected or exhausted for {next_at - now:.0f}s"
+                ))
+                return
+        if next_at != INF:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = asyncio.get_running_loop().call_later(max(0.0, next_at - now), self._dispatch)
+
+    def _fail_waiting(self, error: Exception) -> None:
+        self._waiting.clear()
+        queues, self._queues = self._queues, {}
+        for users in queues.values():
+            for queue in users.values():
+                for fut in queue:
+                    if not fut.done():
+                        fut.set_exception(error)
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """"interactive:8,batch:2" -> {"interactive": 8.0, "batch": 2.0} (over the defaults)."""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in spec.split(","):
+        name, _, value = part.partition(":")
+        if name.strip() and value.strip():
+            weights[name.strip()] = float(value)
+    return weights
+
+
+def pool_from_settings(keys: Optional[Iterable[str]] = None) -> KeyPool:
+    s = get_settings()
+    return KeyPool(
+        s.harvest_api_keys if keys is None else keys,
+        max_in_flight=s.harvest_key_concurrency,
+        rate=s.harvest_key_rate,
+        quota=s.harvest_key_quota,
+        quota_window=s.harvest_key_quota_window,
+        cooldown=s.harvest_key_cooldown,
+        auth_cooldown=s.harvest_key_auth_cooldown,
+        queue_timeout=s.harvest_queue_timeout,
+        weights=parse_weights(s.harvest_lane_weights),
+    )
+
+
+_pool: Optional[KeyPool] = None
+
+
+def get_key_pool() -> KeyPool:
+    """Process-wide pool over settings.harvest_api_keys (created on first use)."""
+    global _pool
+    if _pool is None:
+        _pool = pool_from_settings()
+    return _pool
@@ -1,117 +1,212 @@
+import os
+import asyncio
 import logging
-from fastapi import FastAPI, HTTPException
-from .models import Criteria
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from .models import BatchSearch, Criteria, ExplainRequest, SavedSearchIn
 from .clients.harvest_client import HarvestClient
+from .clients.key_pool import get_key_pool, harvest_lane
+from .services.batch import normalize_candidates, process_candidates, score_candidates, shutdown_executor
 from .services.normalize import normalize_person
-from .services.scoring import score_candidate
-from .services.utils import dedupe              # NEW: for de-duplication
-from .storage.repository import save_candidates_csv
-
-# Configure structured logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from .services.ranking import TopK, merge_ranked, rank
+from .services.refresh import RefreshScheduler
+from .services.rules import get_engine
+from .services.scoring import explain_score
+from .services.search import ROTATION_QUERIES, HarvestFetcher, collect_candidates
+from .services.utils import candidate_key, dedupe
+from .settings import get_settings
+from .storage.export import FORMATS, ExportFilter, check_format, export_candidates
+from .storage.repository import csv_path
+from .storage.saved_searches import SavedSearchStore
+from .storage.writer import CsvWriter
+from . import tracing
+from .tracing import span
+
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Pioneers Founder Scout")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resolve configuration once (reads .env); everything below uses it.
+    app.state.settings = settings = get_settings()
+    # Structured JSON logs + span export (see TRACE_* / LOG_* settings)
+    tracing.configure(settings)
+    app.state.writer = CsvWriter()
+    app.state.writer.start()
+    app.state.saved_searches = SavedSearchStore()
+    app.state.scheduler = RefreshScheduler(app.state.saved_searches, HarvestClient)
+    if settings.scheduler_enabled:
+        app.state.scheduler.start()
+    yield
+    await app.state.scheduler.stop()
+    await app.state.writer.stop()
+    shutdown_executor()
+    tracing.shutdown()
+
+
+app = FastAPI(title="Pioneers Founder Scout", lifespan=lifespan)
+
+
+class TraceRequests:
+    """
+    Root span per HTTP request; its trace id is returned as X-Trace-Id.
+    Plain ASGI rather than @app.middleware("http"), so the span stays open
+    until the last body chunk is sent: streamed exports are timed in full,
+    and errors raised mid-stream land on the span.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        sp = tracing.start_span(f"{method} {scope['path']}", **{"http.method": method})
+        sent = 0
+
+        async def traced_send(message) -> None:
+            nonlocal sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                sp.set(**{"http.status_code": status})
+                if status >= 500:
+                    sp.error = f"HTTP {status}"
+                message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", sp.trace_id.encode())]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            with tracing.use_span(sp):
+                await self.app(scope, receive, traced_send)
+        except BaseException as e:
+            sp.error = repr(e)
+            raise
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                sp.name = f"{method} {route.path}"
+                sp.set(**{"http.route": route.path})
+            sp.set(**{"http.response_bytes": sent})
+            tracing.end_span(sp)
+
+
+app.add_middleware(TraceRequests)
+
+
+PREVIEW_SIZE = 25  # candidates returned inline by /search
+
+
+def _lane(kind: str, user: Optional[str]) -> str:
+    """Harvest scheduling lane: the kind, split per caller when X-User is sent."""
+    return f"{kind}:{user.strip()}" if user and user.strip() else kind
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
-# --- Rotation config (tweak freely) ---
-ROTATION_QUERIES = [
-    "founder ai",
-    "founder data",
-    "cofounder machine learning",
-    "cto ai",
-    "founder fintech",
-]
-TARGET_RESULTS = 40  # stop after we reach this many unique candidates
 
+@app.get("/storage/writes/{write_id}")
+def write_status(write_id: str):
+    """Status of a queued candidate write returned by /search."""
+    job = app.state.writer.get(write_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown write_id")
+    return job.to_dict()
 
-@app.post("/search")
-async def search(criteria: Criteria):
+@app.get("/candidates/export")
+def export(
+    format: str = "csv",
+    tier: Optional[List[str]] = Query(None),
+    profile_type: Optional[List[str]] = Query(None),
+    q: str = "",
+    numbered: bool = False,
+):
     """
-    Flow:
-      1) Build title keywords from criteria.
-      2) Try Harvest with geoId (if resolvable), then global, then relaxed terms.
-      3) Rotate through broader queries until TARGET_RESULTS is reached.
-      4) Dedupe -> normalize -> score -> save CSV.
+    Stream the candidates CSV ranked (Tier → Score → Name) and filtered, as
+    csv, jsonl or parquet. Memory stays fixed however large the file is:
+    past EXPORT_RUN_ROWS rows the sort spills runs to disk and merges them.
     """
     try:
-        harvest = HarvestClient()
-
-        # Build title keywords
-        title_parts = []
-        if criteria.technical_signal:
-            title_parts += ["CTO", "Engineer", "ML", "AI", "Data"]
-        if criteria.founder_signal:
-            title_parts += ["Founder", "Co-founder"]
-        title = ", ".join(sorted(set(title_parts)))
-
-        # Resolve sector (e.g., "Lisbon"/"Portugal"/"Europe") to a geoId
-        geo_id = ""
-        if criteria.sector and criteria.sector.strip():
-            geo_id = await harvest.lookup_geo_id(criteria.sector.strip())
-
-        # Initial attempts (geoId → global → relaxed founder → founder fintech)
-        attempts = [
-            dict(label="geoId",            search="",                title=title, geo_id=geo_id, location="", page=1, limit=30),
-            dict(label="global",           search="",                title=title, geo_id="",     location="", page=1, limit=30),
-            dict(label="relaxed-founder",  search="founder",         title="",    geo_id="",     location="", page=1, limit=30),
-            dict(label="founder-fintech",  search="founder fintech", title="",    geo_id="",     location="", page=1, limit=30),
-        ]
-
-        allowed = {"search", "title", "geo_id", "location", "page", "limit"}
-        combined_raw = []
-        used_attempt = None
-
-        # Step A: run initial attempts
-        for a in attempts:
-            logger.info(f"Harvest attempt: {a['label']}", extra={
-                'search': a['search'], 'title': a['title'], 'geo_id': a['geo_id']
-            })
-            kwargs = {k: v for k, v in a.items() if k in allowed}
-            try:
-                raw = await harvest.search_people(**kwargs)
-                logger.info(f"Harvest attempt {a['label']} returned {len(raw)} results")
-            except Exception as e:
-                logger.error(f"Harvest attempt {a['label']} failed", extra={
-                    'error': str(e), 'params': kwargs
-                })
-                raw = []
+        check_format(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    path = csv_path()
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="No candidates.csv yet. Run /search first.")
+    filt = ExportFilter(tiers=tier, profile_types=profile_type, q=q)
+    media_type, ext = FORMATS[format]
+    return StreamingResponse(
+        export_candidates(path, format, filt, numbered),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="candidates.{ext}"'},
+    )
 
-            if raw and used_attempt is None:
-                used_attempt = a["label"]
 
-            combined_raw.extend(raw)
-            combined_raw = dedupe(combined_raw)
+@app.get("/harvest/keys")
+def harvest_keys():
+    """Key pool state: per-key load, quota use and cooldowns, and queued requests per lane."""
+    return get_key_pool().describe()
 
-            if len(combined_raw) >= TARGET_RESULTS:
-                logger.info(f"Target reached with {len(combined_raw)} candidates")
 
-            combined_raw.extend(raw)
-            combined_raw = dedupe(combined_raw)
+@app.post("/harvest/keys/reset")
+async def reset_harvest_keys(key: Optional[str] = None):
+    """
+    Bring keys back into rotation after a 401/403 (or clear a throttling
+    cooldown): all keys, or the one whose last four characters are `key`.
+    """
+    reset = get_key_pool().reset(key)
+    if key is not None and not reset:
+        raise HTTPException(status_code=404, detail="Unknown Harvest key")
+    return {"reset": reset}
 
-            if len(combined_raw) >= TARGET_RESULTS:
-                break
 
-        # Step B: rotate broader queries until target reached
-        for q in ROTATION_QUERIES:
-            if len(combined_raw) >= TARGET_RESULTS:
-                break
-            logger.info(f"Harvest rotation query: '{q}'")
-            try:
-                raw = await harvest.search_people(search=q, title="", geo_id="", location="", page=1, limit=30)
-                logger.info(f"Rotation query '{q}' returned {len(raw)} results")
-            except Exception as e:
-                logger.error(f"Rotation query '{q}' failed", extra={'error': str(e)})
-                raw = []
+@app.get("/scoring/rules")
+def scoring_rules():
+    """Active scoring rules (version, weights, tiers)."""
+    return get_engine().current().describe()
+
+
+@app.post("/scoring/reload")
+def reload_scoring_rules():
+    """Reload the rules file now instead of waiting for the mtime check."""
+    engine = get_engine()
+    reloaded = engine.reload(force=True)
+    return {"reloaded": reloaded, **engine.current().describe()}
+
+
+@app.post("/scoring/explain")
+def explain_scoring(body: ExplainRequest):
+    """Score one candidate and list which rules fired and by how much."""
+    candidate = body.candidate
+    if "summary" not in candidate and "match_justification" not in candidate:
+        candidate = normalize_person(candidate)
+    return explain_score(candidate, body.criteria.model_dump())
+
+
+@app.post("/search")
+async def search(criteria: Criteria, durable: bool = False, x_user: Optional[str] = Header(None)):
+    """
+    Flow:
+      1) Build title keywords from criteria.
+      2) Try Harvest with geoId (if resolvable), then global, then relaxed terms.
+      3) Rotate through broader queries until TARGET_RESULTS is reached.
+      4) Dedupe -> normalize -> score -> queue CSV write.
 
-            combined_raw.extend(raw)
-            combined_raw = dedupe(combined_raw)
+    The CSV write runs in the background; poll /storage/writes/{write_id}
+    or pass ?durable=true to wait for it before responding.
+    Harvest calls run in the "interactive" lane (per X-User, if sent).
+    """
+    try:
+        harvest = HarvestFetcher(HarvestClient())
+        with harvest_lane(_lane("interactive", x_user)):
+            found = await collect_candidates(harvest, criteria)
+        combined_raw = found["raw"]
+        geo_id = found["geo_id"]
 
         # Handle case where no results found
         if not combined_raw:
@@ -121,28 +216,171 @@ async def search(criteria: Criteria):
                 "csv_path": None,
                 "items": [],
                 "geo_id_used": geo_id or None,
-                "attempt_used": used_attempt,
+                "attempt_used": found["attempt_used"],
                 "rotations_used": ROTATION_QUERIES,
                 "message": "No candidates found. Try different search criteria."
             }
 
         # Normalize, score, save
         logger.info(f"Processing {len(combined_raw)} candidates")
-        normalized = [normalize_person(p) for p in combined_raw]
-        scored = [score_candidate(p, criteria.model_dump()) for p in normalized]
-        csv_path = save_candidates_csv(scored)
+        preview = TopK(PREVIEW_SIZE)
+        with span("pipeline.normalize_score", count=len(combined_raw)):
+            scored = await process_candidates(combined_raw, criteria.model_dump(), on_chunk=preview.extend)
+        job = await app.state.writer.submit(scored, durable=durable)
+        if durable:
+            await app.state.writer.wait(job.id)
 
-        logger.info(f"Saved {len(scored)} candidates to {csv_path}")
+        logger.info(f"Queued {len(scored)} candidates for write {job.id}")
 
         return {
             "count": len(scored),
-            "csv_path": csv_path,
-            "items": scored[:25],           # preview
+            "csv_path": job.csv_path or csv_path(),
+            "write_id": job.id,
+            "write_status": job.status,
+            "items": preview.items(),       # best PREVIEW_SIZE, ranked
             "geo_id_used": geo_id or None,
-            "attempt_used": used_attempt,   # which initial attempt returned first
+            "attempt_used": found["attempt_used"],   # which initial attempt returned first
             "rotations_used": ROTATION_QUERIES,
         }
 
     except Exception as e:
         logger.error(f"Search failed", extra={'error': str(e), 'criteria': criteria.model_dump()})
         raise HTTPException(status_code=500, detail=f"/search failed: {repr(e)}")
+
+
+@app.post("/search/batch")
+async def search_batch(batch: BatchSearch, durable: bool = False, x_user: Optional[str] = Header(None)):
+    """
+    Run many criteria in one call.
+      1) Plan every criteria's attempts against one shared HarvestFetcher, so
+         shared geo lookups and shared queries are fetched once, with at most
+         HARVEST_CONCURRENCY calls in flight.
+      2) Dedupe all results into one candidate pool and normalize it once.
+      3) Score the pool per criteria and return each criteria's ranked top_n.
+      4) Queue one CSV write with each candidate's best-scoring row.
+    Harvest calls run in the lower-weight "batch" lane, so a large batch
+    shares the API keys with interactive searches instead of starving them.
+    """
+    try:
+        harvest = HarvestFetcher(HarvestClient())
+        with harvest_lane(_lane("batch", x_user)):
+            found = await asyncio.gather(*(collect_candidates(harvest, c) for c in batch.criteria))
+
+        # One deduplicated pool across all criteria, normalized once
+        with span("pipeline.dedupe") as sp:
+            pool_raw = dedupe([p for f in found for p in f["raw"]])
+            sp.set(output_count=len(pool_raw))
+        with span("pipeline.normalize", count=len(pool_raw)):
+            normalized = await normalize_candidates(pool_raw)
+        pool = {candidate_key(raw): norm for raw, norm in zip(pool_raw, normalized)}
+        logger.info(f"Batch of {len(batch.criteria)} criteria: {len(pool)} unique candidates, "
+                    f"{harvest.api_calls} Harvest calls")
+
+        results = []
+        runs = []
+        key_of: Dict[int, Tuple[str, str]] = {}
+        for i, (criteria, f) in enumerate(zip(batch.criteria, found)):
+            keys = [candidate_key(p) for p in f["raw"]]
+            with span("pipeline.score", index=i, count=len(keys)):
+                scored = await score_candidates([pool[k] for k in keys], criteria.model_dump())
+            key_of.update((id(c), k) for k, c in zip(keys, scored))
+            ranked = rank(scored)
+            runs.append(ranked)
+            results.append({
+                "index": i,
+                "criteria": criteria.model_dump(),
+                "count": len(scored),
+                "items": ranked[:batch.top_n],
+                "geo_id_used": f["geo_id"] or None,
+                "attempt_used": f["attempt_used"],
+            })
+
+        # k-way merge of the per-criteria rankings; first row per candidate is its best
+        with span("pipeline.merge", runs=len(runs)):
+            best = list(merge_ranked(*runs, unique_by=lambda c: key_of[id(c)]))
+        job = None
+        if best:
+            job = await app.state.writer.submit(best, durable=durable)
+            if durable:
+                await app.state.writer.wait(job.id)
+
+        return {
+            "count": len(batch.criteria),
+            "pool_size": len(pool),
+            "api_calls": harvest.api_calls,
+            "csv_path": (job.csv_path or csv_path()) if job else None,
+            "write_id": job.id if job else None,
+            "write_status": job.status if job else None,
+            "results": results,
+            "rotations_used": ROTATION_QUERIES,
+        }
+
+    except Exception as e:
+        logger.error(f"Batch search failed", extra={'error': str(e)})
+        raise HTTPException(status_code=500, detail=f"/search/batch failed: {repr(e)}")
+
+
+@app.post("/saved-searches")
+async def create_saved_search(body: SavedSearchIn):
+    """Save criteria for the scheduler; the first run happens on the next tick."""
+    store = app.state.saved_searches
+    return await asyncio.to_thread(store.create, body.name, body.criteria.model_dump(), body.interval_minutes)
+
+
+@app.get("/saved-searches")
+async def list_saved_searches():
+    return await asyncio.to_thread(app.state.saved_searches.list)
+
+
+@app.get("/saved-searches/{search_id}")
+async def get_saved_search(search_id: str):
+    saved = await asyncio.to_thread(app.state.saved_searches.get, search_id)
+    if saved is None:
+        raise HTTPException(status_code=404, detail="Unknown saved search")
+    return saved
+
+
+@app.delete("/saved-searches/{search_id}")
+async def delete_saved_search(search_id: str):
+    if not await asyncio.to_thread(app.state.saved_searches.delete, search_id):
+        raise HTTPException(status_code=404, detail="Unknown saved search")
+    return {"deleted": search_id}
+
+
+@app.post("/saved-searches/{search_id}/run")
+async def run_saved_search_now(search_id: str):
+    """Refresh a saved search immediately instead of waiting for the scheduler."""
+    try:
+        summary = await app.state.scheduler.run(search_id)
+    except Exception as e:
+        logger.error(f"Saved search run failed", extra={'error': str(e), 'saved_search_id': search_id})
+        raise HTTPException(status_code=500, detail=f"saved search run failed: {repr(e)}")
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Unknown saved search")
+    return summary
+
+
+@app.get("/saved-searches/{search_id}/deltas")
+async def saved_search_deltas(search_id: str, since: int = 0, limit: int = 500):
+    """
+    Delta feed: new / changed / removed candidates (by candidate_key) with
+    seq > since, oldest first. Pass the returned `next_since` on the next call.
+    """
+    store = app.state.saved_searches
+    if await asyncio.to_thread(store.get, search_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown saved search")
+
+    def read():
+        out = []
+        for ev in store.iter_deltas(search_id, since):
+            out.append(ev)
+            if len(out) >= limit:
+                break
+        return out
+
+    events = await asyncio.to_thread(read)
+    return {
+        "saved_search_id": search_id,
+        "events": events,
+        "next_since": events[-1]["seq"] if events else since,
+    }
@@ -1,5 +1,5 @@
-from typing import List, Optional, Literal
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Literal
+from pydantic import BaseModel, Field
 
 ProfileType = Literal["business", "technical"]
 
@@ -11,6 +11,19 @@ class Criteria(BaseModel):
     technical_signal: bool = True
     startup_experience_required: bool = True
 
+class BatchSearch(BaseModel):
+    criteria: List[Criteria] = Field(..., min_length=1, max_length=100)
+    top_n: int = Field(25, ge=1, le=500)
+
+class SavedSearchIn(BaseModel):
+    name: str
+    criteria: Criteria
+    interval_minutes: int = Field(1440, ge=5)
+
+class ExplainRequest(BaseModel):
+    candidate: Dict[str, Any]       # normalized candidate, or a raw Harvest profile
+    criteria: Criteria = Criteria()
+
 class Candidate(BaseModel):
     name: str
     profile_type: ProfileType
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ..settings import get_settings
+from .normalize import normalize_person
+from .rules import get_engine
+from .scoring import score_candidate
+
+logger = logging.getLogger(__name__)
+
+# Batches up to settings.batch_inline_max are processed inline on the event
+# loop; the executor round-trip costs more than the work for a single search.
+_executor: Optional[Executor] = None
+
+
+def normalize_and_score(raw: List[Dict[str, Any]], criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Normalize then score a list of raw Harvest profiles, preserving order."""
+    return [score_candidate(normalize_person(p), criteria) for p in raw]
+
+
+def normalize_all(raw: List[Dict[str, Any]], criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Normalize raw Harvest profiles; `criteria` is unused (chunk-runner signature)."""
+    return [normalize_person(p) for p in raw]
+
+
+def score_copies(normalized: List[Dict[str, Any]], criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Score copies of normalized candidates, leaving the inputs untouched."""
+    return [score_candidate(dict(p), criteria) for p in normalized]
+
+
+def run_synced(
+    fn: Callable[[List[Dict[str, Any]], Dict[str, Any]], List[Dict[str, Any]]],
+    items: List[Dict[str, Any]],
+    criteria: Dict[str, Any],
+    rules_digest: Optional[str],
+) -> List[Dict[str, Any]]:
+    """
+    Pool-side wrapper: workers keep their own RuleEngine, so first reload it
+    if the caller's rules differ (e.g. after POST /scoring/reload).
+    """
+    if rules_digest:
+        get_engine().sync(rules_digest)
+    return fn(items, criteria)
+
+
+def chunked(items: List[Any], size: int) -> Iterator[List[Any]]:
+    size = max(1, size)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def get_executor() -> Executor:
+    """Lazily create the shared pool used for large batches."""
+    global _executor
+    if _executor is None:
+        settings = get_settings()
+        if settings.batch_executor == "thread":
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(max_workers=settings.batch_max_workers, thread_name_prefix="batch")
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            _executor = ProcessPoolExecutor(max_workers=settings.batch_max_workers)
+        logger.info(f"Started {settings.batch_executor} pool for batch processing")
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def _run_chunked(
+    fn: Callable[[List[Dict[str, Any]], Dict[str, Any]], List[Dict[str, Any]]],
+    items: List[Dict[str, Any]],
+    criteria: Dict[str, Any],
+    chunk_size: Optional[int],
+    inline_max: Optional[int],
+    executor: Optional[Executor],
+    on_chunk: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    scores: bool = True,
+) -> List[Dict[str, Any]]:
+    settings = get_settings()
+    inline_max = settings.batch_inline_max if inline_max is None else inline_max
+    if len(items) <= inline_max:
+        result = fn(items, criteria)
+        if on_chunk is not None:
+            on_chunk(result)
+        return result
+
+    loop = asyncio.get_running_loop()
+    pool = executor or get_executor()
+    chunks = list(chunked(items, chunk_size or settings.batch_chunk_size))
+    logger.info(f"Processing {len(items)} candidates in {len(chunks)} chunks")
+    digest = None
+    if scores:
+        engine = get_engine()
+        engine.current()            # apply any pending mtime reload here first
+        digest = engine.digest
+    futures = [loop.run_in_executor(pool, run_synced, fn, chunk, criteria, digest) for chunk in chunks]
+    if on_chunk is not None:
+        # Deliver each chunk as soon as it finishes (completion order)
+        def deliver(f: "asyncio.Future") -> None:
+            if not f.cancelled() and f.exception() is None:
+                on_chunk(f.result())
+        for f in futures:
+            f.add_done_callback(deliver)
+    parts = await asyncio.gather(*futures)
+    return [p for part in parts for p in part]
+
+
+async def process_candidates(
+    raw: List[Dict[str, Any]],
+    criteria: Dict[str, Any],
+    chunk_size: Optional[int] = None,
+    inline_max: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    on_chunk: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Normalize + score `raw` without blocking the event loop.
+    Small batches run inline; larger ones are split into chunks and fanned
+    out to the pool. Results come back in input order; `on_chunk` also
+    receives each scored chunk as it completes (e.g. to feed a TopK).
+    """
+    return await _run_chunked(normalize_and_score, raw, criteria, chunk_size, inline_max, executor, on_chunk)
+
+
+async def normalize_candidates(
+    raw: List[Dict[str, Any]],
+    chunk_size: Optional[int] = None,
+    inline_max: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> List[Dict[str, Any]]:
+    """Normalize only, for pools that are scored against several criteria."""
+    return await _run_chunked(normalize_all, raw, {}, chunk_size, inline_max, executor, scores=False)
+
+
+async def score_candidates(
+    normalized: List[Dict[str, Any]],
+    criteria: Dict[str, Any],
+    chunk_size: Optional[int] = None,
+    inline_max: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    on_chunk: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Score already-normalized candidates against `criteria`, same chunking
+    rules as `process_candidates`. Input dicts are not modified, so one
+    normalized pool can be scored against several criteria.
+    """
+    return await _run_chunked(score_copies, normalized, criteria, chunk_size, inline_max, executor, on_chunk)
@@ -1,4 +1,5 @@
 from typing import Dict, Any
+from .rules import get_engine
 
 def normalize_person(raw: Dict[str, Any]) -> Dict[str, Any]:
     name       = raw.get("name") or raw.get("publicIdentifier") or "LinkedIn Member"
@@ -14,9 +15,7 @@ def normalize_person(raw: Dict[str, Any]) -> Dict[str, Any]:
         if public_id.replace('-', '').replace('_', '').isalnum():
             linkedin = f"https://www.linkedin.com/in/{public_id}"
 
-    profile_type = "technical" if any(
-        k in headline.lower() for k in ["cto","engineer","developer","ml","ai","data","research"]
-    ) else "business"
+    profile_type = get_engine().current().profile_type(headline)
 
     summary = (headline + (f" · {location}" if location else "")).strip() or "Experienced operator/founder."
     contacts = [linkedin] if linkedin else []
@@ -0,0 +1,94 @@
+import heapq
+import itertools
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Tier → Score (desc) → Name, the order used by the CSV, the API and the UI
+TIER_ORDER = {"A": 1, "B": 2, "C": 3}
+
+
+def rank_key(c: Dict[str, Any]) -> Tuple[int, int, str]:
+    tier = str(c.get("tier") or "").strip().upper()
+    try:
+        score = int(c.get("score") or 0)
+    except (TypeError, ValueError):
+        score = 0
+    return (TIER_ORDER.get(tier, 9), -score, str(c.get("name") or ""))
+
+
+class _Worst:
+    """Heap entry that inverts ordering, so heap[0] is the worst kept item."""
+    __slots__ = ("key", "item")
+
+    def __init__(self, key: Tuple, item: Dict[str, Any]) -> None:
+        self.key = key
+        self.item = item
+
+    def __lt__(self, other: "_Worst") -> bool:
+        return self.key > other.key
+
+
+class TopK:
+    """
+    Bounded best-K tracker. push() is O(log K); items() can be read at any
+    point while candidates are still arriving (e.g. per scored chunk).
+    Ties keep arrival order, matching a stable sort.
+    """
+
+    def __init__(self, k: int, key: Callable[[Dict[str, Any]], Tuple] = rank_key) -> None:
+        self.k = max(0, k)
+        self.key = key
+        self._heap: List[_Worst] = []
+        self._seq = itertools.count()
+        self.seen = 0
+
+    def push(self, item: Dict[str, Any]) -> None:
+        self.seen += 1
+        if self.k == 0:
+            return
+        entry = _Worst(self.key(item) + (next(self._seq),), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry.key < self._heap[0].key:
+            heapq.heapreplace(self._heap, entry)
+
+    def extend(self, items: Iterable[Dict[str, Any]]) -> None:
+        for item in items:
+            self.push(item)
+
+    def items(self) -> List[Dict[str, Any]]:
+        """Current best K, best first."""
+        return [e.item for e in sorted(self._heap, key=lambda e: e.key)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def top_k(items: Iterable[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+    """Best `k` items, best first, in O(n log k)."""
+    return heapq.nsmallest(k, items, key=rank_key)
+
+
+def rank(items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Full ranking; only for outputs that need every row in order."""
+    return sorted(items, key=rank_key)
+
+
+def merge_ranked(
+    *runs: Iterable[Dict[str, Any]],
+    unique_by: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    k-way merge of already-ranked runs into one ranked stream. With
+    `unique_by`, only the first (best-ranked) row per identity is kept.
+    """
+    merged = heapq.merge(*runs, key=rank_key)
+    if unique_by is None:
+        yield from merged
+        return
+    seen = set()
+    for row in merged:
+        ident = unique_by(row)
+        if ident in seen:
+            continue
+        seen.add(ident)
+        yield row
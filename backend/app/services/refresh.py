@@ -0,0 +1,206 @@
+import json
+import uuid
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+from ..clients.key_pool import harvest_lane
+from ..models import Criteria
+from ..settings import get_settings
+from ..storage.saved_searches import SavedSearchStore
+from ..tracing import span
+from .batch import process_candidates
+from .search import HarvestFetcher, PageCache, collect_candidates
+from .utils import candidate_key
+
+logger = logging.getLogger(__name__)
+
+# Fields compared between runs to decide whether a candidate "changed"
+FINGERPRINT_FIELDS = ["name", "profile_type", "summary", "contacts", "source_links", "tier", "score"]
+
+
+def key_str(key: Tuple[str, str]) -> str:
+    return "|".join(key)
+
+
+def fingerprint(candidate: Dict[str, Any]) -> str:
+    payload = json.dumps([candidate.get(k) for k in FINGERPRINT_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def diff_snapshot(
+    previous: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    complete: bool,
+    fetched: Collection[str] = (),
+) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Compare two snapshots ({key: {"key", "fp", "candidate", "sources"}}).
+    Returns (events, next_snapshot). Candidates missing from `current` are
+    reported as removed when the run was `complete`, or when every page
+    they were found on (their "sources") was `fetched` again; otherwise
+    they stay in the snapshot, since the run never looked for them.
+    """
+    events: List[Dict[str, Any]] = []
+    nxt: Dict[str, Dict[str, Any]] = {}
+
+    for key, entry in current.items():
+        old = previous.get(key)
+        if old is None:
+            events.append({"change": "new", "key": key, "candidate": entry["candidate"]})
+        elif old["fp"] != entry["fp"]:
+            events.append({
+                "change": "changed", "key": key, "candidate": entry["candidate"],
+                "previous": {k: old["candidate"].get(k) for k in ("summary", "tier", "score")},
+            })
+        nxt[key] = entry
+
+    for key, old in previous.items():
+        if key in current:
+            continue
+        sources = old.get("sources")
+        if complete or (sources and all(pid in fetched for pid in sources)):
+            events.append({"change": "removed", "key": key, "candidate": old["candidate"]})
+        else:
+            nxt[key] = old
+
+    return events, nxt
+
+
+async def run_saved_search(
+    store: SavedSearchStore,
+    saved: Dict[str, Any],
+    harvest: Any,
+    cache: Optional[PageCache] = None,
+    full_every: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Re-run one saved search incrementally and append its delta to the feed.
+    `harvest` is a HarvestClient (or anything with the same two methods).
+    Every `full_every`-th run (REFRESH_FULL_EVERY) ignores the snapshot and
+    fetches every page, so rotation queries are refreshed too.
+    Returns None if the saved search was deleted while it ran.
+    """
+    if full_every is None:
+        full_every = get_settings().refresh_full_every
+    # a root span when run by the scheduler, a child of the request span otherwise
+    with span("refresh.run", saved_search_id=saved["id"]) as sp:
+        run_id = uuid.uuid4().hex[:12]
+        full_run = saved.get("runs", 0) % max(1, full_every) == 0
+        sp.set(run_id=run_id, full_run=full_run)
+        previous = await asyncio.to_thread(store.load_snapshot, saved["id"])
+        known = None if full_run else {tuple(entry["key"]) for entry in previous.values()}
+
+        # Pages cached by this search's own previous run are at least an
+        # interval old; only reuse pages fetched since (by other searches).
+        max_age = saved["interval_minutes"] * 60 / 2
+        fetcher = HarvestFetcher(harvest, cache=cache, cache_max_age=max_age)
+        criteria = Criteria(**saved["criteria"])
+        found = await collect_candidates(fetcher, criteria, known_keys=known)
+
+        scored = await process_candidates(found["raw"], criteria.model_dump())
+        current = {}
+        for raw, c in zip(found["raw"], scored):
+            key = candidate_key(raw)
+            current[key_str(key)] = {
+                "key": list(key), "fp": fingerprint(c), "candidate": c,
+                "sources": found["sources"].get(key, []),
+            }
+        # An empty run is far more likely a Harvest outage than everyone leaving.
+        complete = bool(current) and not found["stopped_early"]
+        events, snapshot = diff_snapshot(previous, current, complete, fetched=found["pages"])
+
+        at = datetime.now().isoformat()
+        for ev in events:
+            ev.update(run_id=run_id, at=at)
+        updated = await asyncio.to_thread(store.record_run, saved["id"], run_id, snapshot, events)
+        if updated is None:
+            sp.set(deleted=True)
+            logger.info(f"Saved search {saved['id']} was deleted during run {run_id}; result dropped")
+            return None
+
+        summary = {
+            "saved_search_id": saved["id"],
+            "run_id": run_id,
+            "fetched": len(current),
+            "api_calls": fetcher.api_calls,
+            "full_run": full_run,
+            "stopped_early": found["stopped_early"],
+            "new": sum(1 for e in events if e["change"] == "new"),
+            "changed": sum(1 for e in events if e["change"] == "changed"),
+            "removed": sum(1 for e in events if e["change"] == "removed"),
+            "last_seq": updated["last_seq"],
+            "next_run_at": updated["next_run_at"],
+        }
+        sp.set(**{k: summary[k] for k in ("fetched", "api_calls", "new", "changed", "removed")})
+        logger.info(f"Saved search {saved['id']} refreshed", extra=summary)
+        return summary
+
+
+class RefreshScheduler:
+    """
+    Background task that re-runs due saved searches every `tick` seconds.
+    Runs share one PageCache so rotation queries common to several saved
+    searches are fetched once per cache TTL. A per-search lock keeps a
+    manual run and a scheduled run of the same search from overlapping.
+    """
+
+    def __init__(
+        self,
+        store: SavedSearchStore,
+        client_factory: Callable[[], Any],
+        tick: Optional[float] = None,
+        cache: Optional[PageCache] = None,
+    ) -> None:
+        self.store = store
+        self.client_factory = client_factory
+        self.tick = get_settings().scheduler_tick_seconds if tick is None else tick
+        self.cache = cache or PageCache()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self, search_id: str) -> Optional[Dict[str, Any]]:
+        lock = self._locks.setdefault(search_id, asyncio.Lock())
+        async with lock:
+            saved = await asyncio.to_thread(self.store.get, search_id)
+            if saved is None:
+                return None
+            return await run_saved_search(self.store, saved, self.client_factory(), self.cache)
+
+    async def run_due(self) -> List[Dict[str, Any]]:
+        results = []
+        for saved in await asyncio.to_thread(self.store.due):
+            try:
+                # lowest-weight lane: scheduled refreshes yield to people waiting
+                with harvest_lane("scheduled"):
+                    summary = await self.run(saved["id"])
+                if summary:
+                    results.append(summary)
+            except Exception as e:
+                logger.error(f"Saved search {saved['id']} refresh failed", extra={'error': str(e)})
+        return results
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_due()
+            except Exception as e:
+                # e.g. an unreadable saved_searches.json: keep ticking
+                logger.error(f"Saved search scheduler tick failed", extra={'error': str(e)})
+            await asyncio.sleep(self.tick)
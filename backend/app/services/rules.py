@@ -0,0 +1,303 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "scoring_rules.json")
+
+RULE_TYPES = ("keywords", "criterion_text", "criterion_keywords", "min_years")
+
+_YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:years|yrs)")
+_SPLIT_RE = re.compile(r",|/|\bor\b|\band\b")
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    type: str
+    weight: int
+    keywords: Tuple[str, ...] = ()
+    criterion: Optional[str] = None
+    requires: Optional[str] = None
+    disabled_criterion: Optional[str] = None
+    disabled_weight: int = 0
+
+    @property
+    def inert(self) -> bool:
+        """Weight 0 either way: shipped switched off (opt in by giving it a weight)."""
+        return not self.weight and not self.disabled_weight
+
+    def weight_for(self, criteria: Dict[str, Any]) -> int:
+        if self.disabled_criterion and not criteria.get(self.disabled_criterion, True):
+            return self.disabled_weight
+        return self.weight
+
+
+@dataclass
+class CompiledRules:
+    """
+    A rules config compiled for evaluation.
+    `score()` runs a Python function generated from the config: the text is
+    lowercased once and every rule becomes an unrolled chain of
+    `"kw" in tl` tests with its weight inlined, i.e. the same code one would
+    write by hand. (A single combined-regex scan was measured several times
+    slower than CPython's C substring search on profile-sized text.)
+    `explain()` walks the same rules interpretively to report what fired.
+    """
+    version: Any
+    rules: List[Rule]
+    max_score: int
+    tiers: List[Tuple[int, str]]
+    default_tier: str
+    profile_keywords: Tuple[str, ...]
+    profile_match: str
+    profile_default: str
+    source: str = ""
+    _score: Callable[[str, Dict[str, Any]], Tuple[int, str]] = field(default=None, repr=False)
+    _profile: Callable[[str], bool] = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        self._score, self._profile = _codegen(self)
+
+    def score(self, text: str, criteria: Dict[str, Any]) -> Tuple[int, str]:
+        return self._score(text.lower(), criteria)
+
+    def explain(self, text: str, criteria: Dict[str, Any]) -> Tuple[int, str, List[Dict[str, Any]]]:
+        """
+        Score `text` against `criteria` rule by rule.
+        Returns (score, tier, fired) where fired lists {rule, weight, match}.
+        """
+        tl = text.lower()
+        fired: List[Dict[str, Any]] = []
+        score = 0
+        for rule in self.rules:
+            if rule.inert or (rule.requires and not criteria.get(rule.requires)):
+                continue
+            match = None
+            if rule.type == "keywords":
+                match = next((kw for kw in rule.keywords if kw in tl), None)
+            elif rule.type == "criterion_text":
+                value = (criteria.get(rule.criterion) or "").lower()
+                if value and value in tl:
+                    match = value
+            elif rule.type == "criterion_keywords":
+                match = next((kw for kw in _split_terms(criteria.get(rule.criterion)) if kw in tl), None)
+            elif rule.type == "min_years":
+                years = _max_years(tl, criteria.get(rule.criterion) or 0)
+                if years:
+                    match = f"{years} years"
+            if match is None:
+                continue
+            weight = rule.weight_for(criteria)
+            score += weight
+            fired.append({"rule": rule.id, "weight": weight, "match": match})
+
+        score = max(0, min(self.max_score, score))
+        return score, self.tier_for(score), fired
+
+    def tier_for(self, score: int) -> str:
+        for min_score, tier in self.tiers:
+            if score >= min_score:
+                return tier
+        return self.default_tier
+
+    def profile_type(self, headline: str) -> str:
+        return self.profile_match if self._profile(headline.lower()) else self.profile_default
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "rules": [{"id": r.id, "type": r.type, "weight": r.weight} for r in self.rules],
+            "tiers": [{"tier": t, "min_score": s} for s, t in self.tiers],
+        }
+
+
+def _any_in(keywords: Tuple[str, ...]) -> str:
+    return " or ".join(f"{kw!r} in tl" for kw in keywords) or "False"
+
+
+def _codegen(compiled: "CompiledRules"):
+    """Generate and compile the fast scoring / profile functions for a ruleset."""
+    lines = ["def _score(tl, criteria):", "    s = 0"]
+    for rule in compiled.rules:
+        if rule.inert:
+            continue
+        weight = repr(rule.weight)
+        if rule.disabled_criterion:
+            weight = f"({rule.weight!r} if criteria.get({rule.disabled_criterion!r}, True) else {rule.disabled_weight!r})"
+        if rule.type == "keywords":
+            cond = _any_in(rule.keywords)
+        elif rule.type == "criterion_text":
+            cond = f"_criterion_in(criteria.get({rule.criterion!r}), tl)"
+        elif rule.type == "criterion_keywords":
+            cond = f"_terms_in(criteria.get({rule.criterion!r}), tl)"
+        else:  # min_years
+            cond = f"_max_years(tl, criteria.get({rule.criterion!r}) or 0)"
+        if rule.requires:
+            cond = f"criteria.get({rule.requires!r}) and ({cond})"
+        lines.append(f"    if {cond}: s += {weight}")
+    lines.append(f"    s = 0 if s < 0 else {compiled.max_score!r} if s > {compiled.max_score!r} else s")
+    for min_score, tier in compiled.tiers:
+        lines.append(f"    if s >= {min_score!r}: return s, {tier!r}")
+    lines.append(f"    return s, {compiled.default_tier!r}")
+    lines += ["", "def _profile(tl):", f"    return {_any_in(compiled.profile_keywords)}"]
+
+    namespace: Dict[str, Any] = {
+        "_criterion_in": _criterion_in, "_terms_in": _terms_in, "_max_years": _max_years,
+    }
+    exec(compile("\n".join(lines), f"<scoring rules {compiled.version}>", "exec"), namespace)
+    return namespace["_score"], namespace["_profile"]
+
+
+def _criterion_in(value: Any, tl: str) -> bool:
+    value = (value or "").lower()
+    return bool(value) and value in tl
+
+
+def _terms_in(value: Any, tl: str) -> bool:
+    return any(kw in tl for kw in _split_terms(value))
+
+
+def _max_years(tl: str, wanted: int) -> int:
+    """Largest "N years" mentioned in the text if it meets `wanted`, else 0."""
+    if not wanted or wanted <= 0:
+        return 0
+    years = [int(y) for y in _YEARS_RE.findall(tl)]
+    return max(years) if years and max(years) >= wanted else 0
+
+
+@lru_cache(maxsize=256)
+def _split_terms(value: Any) -> Tuple[str, ...]:
+    if not value:
+        return ()
+    return tuple(t.strip() for t in _SPLIT_RE.split(str(value).lower()) if t.strip())
+
+
+def compile_rules(config: Dict[str, Any], source: str = "") -> CompiledRules:
+    """Validate a rules config dict and compile it. Raises ValueError."""
+    if "version" not in config:
+        raise ValueError("rules config needs a 'version'")
+    rules: List[Rule] = []
+    seen = set()
+    for raw in config.get("rules", []):
+        rid = raw.get("id")
+        if not rid or rid in seen:
+            raise ValueError(f"rule id missing or duplicated: {rid!r}")
+        seen.add(rid)
+        rtype = raw.get("type", "keywords")
+        if rtype not in RULE_TYPES:
+            raise ValueError(f"rule {rid}: unknown type {rtype!r}")
+        if rtype == "keywords" and not raw.get("keywords"):
+            raise ValueError(f"rule {rid}: keywords rule without keywords")
+        if rtype != "keywords" and not raw.get("criterion"):
+            raise ValueError(f"rule {rid}: {rtype} rule needs a 'criterion'")
+        disabled = raw.get("when_disabled") or {}
+        rules.append(Rule(
+            id=rid,
+            type=rtype,
+            weight=int(raw.get("weight", 0)),
+            keywords=tuple(k.lower() for k in raw.get("keywords", [])),
+            criterion=raw.get("criterion"),
+            requires=raw.get("requires"),
+            disabled_criterion=disabled.get("criterion"),
+            disabled_weight=int(disabled.get("weight", 0)),
+        ))
+
+    tiers = sorted(((int(t["min_score"]), t["tier"]) for t in config.get("tiers", [])), reverse=True)
+    profile = config.get("profile_type", {})
+    return CompiledRules(
+        version=config["version"],
+        rules=rules,
+        max_score=int(config.get("max_score", 100)),
+        tiers=tiers,
+        default_tier=config.get("default_tier", "C"),
+        profile_keywords=tuple(k.lower() for k in profile.get("keywords", [])),
+        profile_match=profile.get("match", "technical"),
+        profile_default=profile.get("default", "business"),
+        source=source,
+    )
+
+
+def load_rules(path: str) -> CompiledRules:
+    with open(path, encoding="utf-8") as f:
+        return compile_rules(json.load(f), source=path)
+
+
+def _load_digest(path: str) -> Tuple[CompiledRules, str]:
+    """Compiled rules plus a digest of the file they came from."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return compile_rules(json.loads(data), source=path), hashlib.sha1(data).hexdigest()[:16]
+
+
+class RuleEngine:
+    """
+    Holds the compiled rules for one config file and hot-reloads them when
+    the file changes. The mtime is checked at most every `check_interval`
+    seconds so rescoring a large archive does not stat the file per row.
+    A config that fails to load or validate is logged and the previous
+    rules stay active. `digest` identifies the active file contents, so
+    pool workers can follow a reload forced in the parent (see `sync`).
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._rules, self.digest = _load_digest(path)
+        self._mtime = os.stat(path).st_mtime
+        self._checked = time.monotonic()
+
+    def current(self) -> CompiledRules:
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self._checked = now
+            self.reload()
+        return self._rules
+
+    def reload(self, force: bool = False) -> bool:
+        """Recompile if the file changed (or `force`). Returns True on reload."""
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime
+                if not force and mtime == self._mtime:
+                    return False
+                rules, digest = _load_digest(self.path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.error(f"Scoring rules reload failed, keeping version {self._rules.version}",
+                             extra={'path': self.path, 'error': str(e)})
+                return False
+            self._rules, self._mtime, self.digest = rules, mtime, digest
+            logger.info(f"Loaded scoring rules version {rules.version} from {self.path}")
+            return True
+
+    def sync(self, digest: Optional[str]) -> None:
+        """Force a reload unless the active rules already have `digest`."""
+        if digest and digest != self.digest:
+            self.reload(force=True)
+
+
+_engine: Optional[RuleEngine] = None
+
+
+def get_engine() -> RuleEngine:
+    """Process-wide engine for settings.scoring_rules_path (created on first use)."""
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        _engine = RuleEngine(
+            settings.scoring_rules_path or DEFAULT_RULES_PATH,
+            check_interval=settings.scoring_rules_check_seconds,
+        )
+    return _engine
@@ -1,20 +1,19 @@
 from typing import Dict, Any
+from .rules import get_engine
 
-def score_candidate(person: Dict[str, Any], criteria: Dict[str, Any]) -> Dict[str, Any]:
-    text = (person.get("summary") or "") + " " + (person.get("match_justification") or "")
-    tl = text.lower()
-    score = 0
-
-    if any(k in tl for k in ["founder","co-founder","exit"]): score += 25
-    if any(k in tl for k in ["cto","engineer","developer","ml","ai","data","research"]):
-        score += 25 if criteria.get("technical_signal", True) else 10
-    if any(k in tl for k in ["phd","msc","master"]): score += 10
-    sector = (criteria.get("sector") or "").lower()
-    if sector and sector in tl: score += 15
-    if any(k in tl for k in ["head of","director","vp","c-level","chief","lead"]): score += 15
+def _candidate_text(person: Dict[str, Any]) -> str:
+    return (person.get("summary") or "") + " " + (person.get("match_justification") or "")
 
-    score = max(0, min(100, score))
+def score_candidate(person: Dict[str, Any], criteria: Dict[str, Any]) -> Dict[str, Any]:
+    # Weights, keywords and tier thresholds come from the scoring rules config
+    # (services/scoring_rules.json or SCORING_RULES_PATH); A=80+, B=60+, C=<60 by default
+    score, tier = get_engine().current().score(_candidate_text(person), criteria)
     person["score"] = score
-    # Adjusted thresholds: A=80+, B=60+, C=<60 for more meaningful tiers
-    person["tier"] = "A" if score >= 80 else "B" if score >= 60 else "C"
+    person["tier"] = tier
     return person
+
+def explain_score(person: Dict[str, Any], criteria: Dict[str, Any]) -> Dict[str, Any]:
+    """Score plus the rules that fired and how much each contributed."""
+    rules = get_engine().current()
+    score, tier, fired = rules.explain(_candidate_text(person), criteria)
+    return {"score": score, "tier": tier, "rules_version": rules.version, "fired": fired}
@@ -0,0 +1,283 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from ..models import Criteria
+from ..settings import get_settings
+from ..tracing import set_attributes, span
+from .utils import candidate_key, dedupe
+
+logger = logging.getLogger(__name__)
+
+# --- Rotation config (tweak freely) ---
+ROTATION_QUERIES = [
+    "founder ai",
+    "founder data",
+    "cofounder machine learning",
+    "cto ai",
+    "founder fintech",
+]
+TARGET_RESULTS = 40  # stop after we reach this many unique candidates
+PAGE_LIMIT = 30
+
+ALLOWED = ("search", "title", "geo_id", "location", "page", "limit")
+
+
+def build_title(criteria: Criteria) -> str:
+    title_parts = []
+    if criteria.technical_signal:
+        title_parts += ["CTO", "Engineer", "ML", "AI", "Data"]
+    if criteria.founder_signal:
+        title_parts += ["Founder", "Co-founder"]
+    return ", ".join(sorted(set(title_parts)))
+
+
+def initial_attempts(title: str, geo_id: str) -> List[Dict[str, Any]]:
+    """Initial attempts (geoId → global → relaxed founder → founder fintech)"""
+    return [
+        dict(label="geoId",            search="",                title=title, geo_id=geo_id, location="", page=1, limit=PAGE_LIMIT),
+        dict(label="global",           search="",                title=title, geo_id="",     location="", page=1, limit=PAGE_LIMIT),
+        dict(label="relaxed-founder",  search="founder",         title="",    geo_id="",     location="", page=1, limit=PAGE_LIMIT),
+        dict(label="founder-fintech",  search="founder fintech", title="",    geo_id="",     location="", page=1, limit=PAGE_LIMIT),
+    ]
+
+
+def rotation_request(query: str) -> Dict[str, Any]:
+    return dict(search=query, title="", geo_id="", location="", page=1, limit=PAGE_LIMIT)
+
+
+def page_id(request: Dict[str, Any]) -> str:
+    """Stable id of a Harvest page request; identical requests share it."""
+    return "|".join(str(request.get(k, "")) for k in ALLOWED if k != "limit")
+
+
+class PageCache:
+    """
+    Small TTL + LRU cache of Harvest results that outlives a single request.
+    Keys are request tuples (see ALLOWED) or ("geo", text) for geo lookups.
+    Empty results are not cached, so a failed call is retried next time.
+    `get(key, max_age)` also skips entries older than `max_age` seconds.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+        settings = get_settings()
+        self.ttl = settings.page_cache_ttl if ttl is None else ttl
+        self.max_entries = settings.page_cache_size if max_entries is None else max_entries
+        self._data: "OrderedDict[Tuple, Tuple[float, float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple, max_age: Optional[float] = None) -> Optional[Any]:
+        entry = self._data.get(key)
+        now = time.monotonic()
+        if entry is None or entry[0] < now:
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        if max_age is not None and now - entry[1] > max_age:
+            self.misses += 1     # too old for this caller, fine for others
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key: Tuple, value: Any) -> None:
+        if not value:
+            return
+        now = time.monotonic()
+        self._data[key] = (now + self.ttl, now, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+
+class HarvestFetcher:
+    """
+    Wraps a HarvestClient so identical page requests and geo lookups made
+    while planning one search (or a batch of searches) hit Harvest once.
+    Concurrent callers asking for the same request share the in-flight
+    task; a semaphore bounds how many calls run at the same time. An
+    optional PageCache carries results across fetchers (scheduled runs);
+    `cache_max_age` ignores cached pages older than that many seconds.
+    """
+
+    def __init__(
+        self,
+        harvest: Any,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[PageCache] = None,
+        cache_max_age: Optional[float] = None,
+    ) -> None:
+        if max_concurrency is None:
+            max_concurrency = get_settings().harvest_concurrency
+        self.harvest = harvest
+        self.cache = cache
+        self.cache_max_age = cache_max_age
+        self._sem = asyncio.Semaphore(max(1, max_concurrency))
+        self._pages: Dict[Tuple, asyncio.Task] = {}
+        self._geo: Dict[str, asyncio.Task] = {}
+        self.api_calls = 0
+
+    async def _cached_call(self, key: Tuple, fn, *args, **kwargs):
+        if self.cache is not None:
+            hit = self.cache.get(key, self.cache_max_age)
+            if hit is not None:
+                set_attributes(cache="hit")
+                return hit
+        set_attributes(cache="miss")
+        result = await self._call(fn, *args, **kwargs)
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return result
+
+    async def _call(self, fn, *args, **kwargs):
+        async with self._sem:
+            self.api_calls += 1
+            return await fn(*args, **kwargs)
+
+    async def search_people(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        key = tuple(kwargs.get(k, "") for k in ALLOWED)
+        with span("harvest.page", **{k: v for k, v in kwargs.items() if k in ALLOWED}) as sp:
+            task = self._pages.get(key)
+            if task is None:
+                # the task copies the current context, so its spans nest under this one
+                task = asyncio.ensure_future(self._cached_call(key, self.harvest.search_people, **kwargs))
+                self._pages[key] = task
+            else:
+                sp.set(cache="shared")
+            result = list(await asyncio.shield(task))
+            sp.set(result_count=len(result))
+            return result
+
+    async def lookup_geo_id(self, search: str) -> str:
+        key = search.strip().lower()
+        with span("harvest.geo", search=search) as sp:
+            task = self._geo.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._cached_call(("geo", key), self.harvest.lookup_geo_id, search))
+                self._geo[key] = task
+            else:
+                sp.set(cache="shared")
+            geo_id = await asyncio.shield(task)
+            sp.set(geo_id=geo_id)
+            return geo_id
+
+
+def _mostly_known(raw: List[Dict[str, Any]], known_keys: Optional[Collection], ratio: float) -> bool:
+    if not known_keys or not raw:
+        return False
+    known = sum(1 for p in raw if candidate_key(p) in known_keys)
+    return known / len(raw) >= ratio
+
+
+async def collect_candidates(
+    harvest: Any,
+    criteria: Criteria,
+    known_keys: Optional[Collection] = None,
+    known_ratio: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Flow:
+      1) Build title keywords from criteria.
+      2) Try Harvest with geoId (if resolvable), then global, then relaxed terms.
+      3) Rotate through broader queries until TARGET_RESULTS is reached.
+    Returns the deduped raw profiles plus which geoId / attempt was used.
+
+    With `known_keys` (candidate_key tuples from a previous run) collection
+    stops as soon as a page is mostly known candidates; `stopped_early`
+    tells the caller the result set is not a full picture. `sources` maps
+    each candidate_key to the page ids (see page_id) it was found on, and
+    `pages` lists the pages that returned results this time.
+    """
+    with span("search.collect", sector=criteria.sector or "") as sp:
+        if known_ratio is None:
+            known_ratio = get_settings().known_stop_ratio
+        title = build_title(criteria)
+
+        # Resolve sector (e.g., "Lisbon"/"Portugal"/"Europe") to a geoId
+        geo_id = ""
+        if criteria.sector and criteria.sector.strip():
+            geo_id = await harvest.lookup_geo_id(criteria.sector.strip())
+
+        combined_raw: List[Dict[str, Any]] = []
+        used_attempt: Optional[str] = None
+        stopped_early = False
+        sources: Dict[Tuple, List[str]] = {}
+        pages: List[str] = []
+
+        def record(request: Dict[str, Any], raw: List[Dict[str, Any]]) -> None:
+            pid = page_id(request)
+            if not raw or pid in pages:
+                return
+            pages.append(pid)
+            for p in raw:
+                sources.setdefault(candidate_key(p), []).append(pid)
+
+        # Step A: run initial attempts
+        for a in initial_attempts(title, geo_id):
+            logger.info(f"Harvest attempt: {a['label']}", extra={
+                'search': a['search'], 'title': a['title'], 'geo_id': a['geo_id']
+            })
+            kwargs = {k: v for k, v in a.items() if k in ALLOWED}
+            try:
+                raw = await harvest.search_people(**kwargs)
+                logger.info(f"Harvest attempt {a['label']} returned {len(raw)} results")
+            except Exception as e:
+                logger.error(f"Harvest attempt {a['label']} failed", extra={
+                    'error': str(e), 'params': kwargs
+                })
+                raw = []
+
+            if raw and used_attempt is None:
+                used_attempt = a["label"]
+
+            record(kwargs, raw)
+            combined_raw.extend(raw)
+            with span("pipeline.dedupe", input_count=len(combined_raw)) as dsp:
+                combined_raw = dedupe(combined_raw)
+                dsp.set(output_count=len(combined_raw))
+
+            if _mostly_known(raw, known_keys, known_ratio):
+                logger.info(f"Attempt {a['label']} was mostly known candidates, stopping early")
+                stopped_early = True
+                break
+
+            if len(combined_raw) >= TARGET_RESULTS:
+                logger.info(f"Target reached with {len(combined_raw)} candidates")
+                break
+
+        # Step B: rotate broader queries until target reached
+        for q in ROTATION_QUERIES:
+            if stopped_early or len(combined_raw) >= TARGET_RESULTS:
+                break
+            logger.info(f"Harvest rotation query: '{q}'")
+            request = rotation_request(q)
+            try:
+                raw = await harvest.search_people(**request)
+                logger.info(f"Rotation query '{q}' returned {len(raw)} results")
+            except Exception as e:
+                logger.error(f"Rotation query '{q}' failed", extra={'error': str(e)})
+                raw = []
+
+            record(request, raw)
+            combined_raw.extend(raw)
+            with span("pipeline.dedupe", input_count=len(combined_raw)) as dsp:
+                combined_raw = dedupe(combined_raw)
+                dsp.set(output_count=len(combined_raw))
+
+            if _mostly_known(raw, known_keys, known_ratio):
+                logger.info(f"Rotation query '{q}' was mostly known candidates, stopping early")
+                stopped_early = True
+
+        sp.set(count=len(combined_raw), geo_id=geo_id, attempt_used=used_attempt, stopped_early=stopped_early)
+        return {
+            "raw": combined_raw,
+            "geo_id": geo_id,
+            "attempt_used": used_attempt,
+            "stopped_early": stopped_early,
+            "sources": sources,
+            "pages": pages,
+        }
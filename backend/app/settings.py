@@ -0,0 +1,109 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    App configuration, resolved once from the environment (and .env).
+    Nothing reads os.environ at import time; call get_settings() at the
+    point of use, or let the FastAPI lifespan resolve it on startup.
+    """
+    harvest_api_key: Optional[str] = None
+    harvest_api_keys: Tuple[str, ...] = ()       # HARVEST_API_KEYS, else (HARVEST_API_KEY,)
+    harvest_base_url: str = "https://api.harvest-api.com"
+    harvest_concurrency: int = 4
+
+    harvest_key_concurrency: int = 4             # in-flight requests per key
+    harvest_key_rate: float = 0.0                # requests/second per key; 0 = unlimited
+    harvest_key_quota: int = 0                   # requests per key per window; 0 = unlimited
+    harvest_key_quota_window: float = 86400.0
+    harvest_key_cooldown: float = 30.0           # after a 429 without Retry-After
+    harvest_key_auth_cooldown: float = 3600.0    # after a 401/403; POST /harvest/keys/reset ends it early
+    harvest_queue_timeout: float = 60.0          # max wait for a free key
+    harvest_lane_weights: str = "interactive:8,batch:2,scheduled:1"
+
+    data_dir: Optional[str] = None               # None -> <repo>/data
+
+    batch_inline_max: int = 200
+    batch_chunk_size: int = 250
+    batch_max_workers: Optional[int] = None     # None -> os.cpu_count()
+    batch_executor: str = "process"             # "process" | "thread"
+
+    storage_queue_size: int = 64
+    storage_max_batch: int = 16
+
+    export_run_rows: int = 50_000                # rows sorted in memory before spilling a run
+
+    page_cache_ttl: float = 900.0
+    page_cache_size: int = 512
+    known_stop_ratio: float = 0.8
+    refresh_full_every: int = 6
+
+    scheduler_enabled: bool = True
+    scheduler_tick_seconds: float = 60.0
+
+    scoring_rules_path: Optional[str] = None     # None -> services/scoring_rules.json
+    scoring_rules_check_seconds: float = 1.0
+
+    trace_export: str = "none"                   # "none" | "file" | "otlp"
+    trace_file: Optional[str] = None             # None -> <data_dir>/traces.jsonl
+    trace_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    trace_sample_rate: float = 1.0
+    log_format: str = "json"                     # "json" | "text"
+    log_level: str = "INFO"
+    log_sample_rate: float = 1.0                 # INFO/DEBUG only; warnings are always kept
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        from dotenv import load_dotenv
+        load_dotenv()
+        env = os.environ
+        # HARVEST_API_KEY joins the HARVEST_API_KEYS pool (first, once)
+        api_key = (env.get("HARVEST_API_KEY") or "").strip() or None
+        listed = [k.strip() for k in env.get("HARVEST_API_KEYS", "").split(",") if k.strip()]
+        api_keys = tuple(dict.fromkeys(([api_key] if api_key else []) + listed))
+        return cls(
+            harvest_api_key=api_keys[0] if api_keys else None,
+            harvest_api_keys=api_keys,
+            harvest_base_url=env.get("HARVEST_BASE_URL", cls.harvest_base_url),
+            harvest_concurrency=int(env.get("HARVEST_CONCURRENCY", cls.harvest_concurrency)),
+            harvest_key_concurrency=int(env.get("HARVEST_KEY_CONCURRENCY", cls.harvest_key_concurrency)),
+            harvest_key_rate=float(env.get("HARVEST_KEY_RATE", cls.harvest_key_rate)),
+            harvest_key_quota=int(env.get("HARVEST_KEY_QUOTA", cls.harvest_key_quota)),
+            harvest_key_quota_window=float(env.get("HARVEST_KEY_QUOTA_WINDOW", cls.harvest_key_quota_window)),
+            harvest_key_cooldown=float(env.get("HARVEST_KEY_COOLDOWN", cls.harvest_key_cooldown)),
+            harvest_key_auth_cooldown=float(env.get("HARVEST_KEY_AUTH_COOLDOWN", cls.harvest_key_auth_cooldown)),
+            harvest_queue_timeout=float(env.get("HARVEST_QUEUE_TIMEOUT", cls.harvest_queue_timeout)),
+            harvest_lane_weights=env.get("HARVEST_LANE_WEIGHTS", cls.harvest_lane_weights),
+            data_dir=env.get("DATA_DIR") or None,
+            batch_inline_max=int(env.get("BATCH_INLINE_MAX", cls.batch_inline_max)),
+            batch_chunk_size=int(env.get("BATCH_CHUNK_SIZE", cls.batch_chunk_size)),
+            batch_max_workers=int(env.get("BATCH_MAX_WORKERS", "0")) or None,
+            batch_executor=env.get("BATCH_EXECUTOR", cls.batch_executor),
+            storage_queue_size=int(env.get("STORAGE_QUEUE_SIZE", cls.storage_queue_size)),
+            storage_max_batch=int(env.get("STORAGE_MAX_BATCH", cls.storage_max_batch)),
+            export_run_rows=int(env.get("EXPORT_RUN_ROWS", cls.export_run_rows)),
+            page_cache_ttl=float(env.get("PAGE_CACHE_TTL", cls.page_cache_ttl)),
+            page_cache_size=int(env.get("PAGE_CACHE_SIZE", cls.page_cache_size)),
+            known_stop_ratio=float(env.get("KNOWN_STOP_RATIO", cls.known_stop_ratio)),
+            refresh_full_every=int(env.get("REFRESH_FULL_EVERY", cls.refresh_full_every)),
+            scheduler_enabled=env.get("SCHEDULER_ENABLED", "1") == "1",
+            scheduler_tick_seconds=float(env.get("SCHEDULER_TICK_SECONDS", cls.scheduler_tick_seconds)),
+            scoring_rules_path=env.get("SCORING_RULES_PATH") or None,
+            scoring_rules_check_seconds=float(env.get("SCORING_RULES_CHECK_SECONDS", cls.scoring_rules_check_seconds)),
+            trace_export=env.get("TRACE_EXPORT", cls.trace_export),
+            trace_file=env.get("TRACE_FILE") or None,
+            trace_otlp_endpoint=env.get("TRACE_OTLP_ENDPOINT", cls.trace_otlp_endpoint),
+            trace_sample_rate=float(env.get("TRACE_SAMPLE_RATE", cls.trace_sample_rate)),
+            log_format=env.get("LOG_FORMAT", cls.log_format),
+            log_level=env.get("LOG_LEVEL", cls.log_level),
+            log_sample_rate=float(env.get("LOG_SAMPLE_RATE", cls.log_sample_rate)),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings.from_env()
@@ -0,0 +1,225 @@
+import io
+import os
+import csv
+import json
+import pickle
+import logging
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from ..services.ranking import merge_ranked, rank_key
+from ..settings import get_settings
+from .repository import REQUIRED
+
+logger = logging.getLogger(__name__)
+
+# format -> (media type, file extension)
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+FLUSH_ROWS = 1000       # rows per yielded chunk / Parquet row group
+READ_CHUNK = 1 << 16    # bytes per chunk when streaming a finished Parquet file
+
+
+def clean_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Same cleaning as the dashboard: no None values, upper-case tier, int score."""
+    out = {k: ("" if row.get(k) is None else row.get(k)) for k in REQUIRED}
+    tier = str(out["tier"]).strip().upper()
+    out["tier"] = "" if tier == "NONE" else tier
+    try:
+        out["score"] = int(float(out["score"] or 0))
+    except (TypeError, ValueError):
+        out["score"] = 0
+    return out
+
+
+def read_candidates(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream cleaned rows from a candidates CSV, one at a time."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield clean_row(row)
+
+
+@dataclass
+class ExportFilter:
+    """Dashboard filters: any of `tiers`, any of `profile_types`, and `q` in name/summary/justification."""
+    tiers: Optional[Sequence[str]] = None
+    profile_types: Optional[Sequence[str]] = None
+    q: str = ""
+
+    def __call__(self, row: Dict[str, Any]) -> bool:
+        if self.tiers and row["tier"] not in self.tiers:
+            return False
+        if self.profile_types and row["profile_type"] not in self.profile_types:
+            return False
+        if self.q:
+            hay = f"{row['name']} {row['summary']} {row['match_justification']}".lower()
+            if self.q.strip().lower() not in hay:
+                return False
+        return True
+
+
+# --- external merge sort ---
+def _spill(run: List[Dict[str, Any]], tmp_dir: Optional[str]):
+    # Independent pickles of FLUSH_ROWS rows each: one long pickle stream
+    # would make the reader's memo keep every row it has returned.
+    f = tempfile.TemporaryFile(dir=tmp_dir)
+    for i in range(0, len(run), FLUSH_ROWS):
+        pickle.dump(run[i:i + FLUSH_ROWS], f, protocol=pickle.HIGHEST_PROTOCOL)
+    f.seek(0)
+    return f
+
+
+def _read_run(f) -> Iterator[Dict[str, Any]]:
+    while True:
+        try:
+            block = pickle.load(f)
+        except EOFError:
+            return
+        yield from block
+
+
+def external_sort(
+    rows: Iterable[Dict[str, Any]],
+    run_rows: Optional[int] = None,
+    tmp_dir: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Rank rows (Tier → Score → Name) in bounded memory. At most `run_rows`
+    rows are held at once: each full buffer is sorted and spilled to a
+    temp file as a run, and the runs are k-way merged on the way out.
+    Input that fits in one run never touches disk. Ties keep input order.
+    """
+    if run_rows is None:
+        run_rows = get_settings().export_run_rows
+    run_rows = max(1, run_rows)
+    runs = []
+    buf: List[Dict[str, Any]] = []
+    try:
+        for row in rows:
+            buf.append(row)
+            if len(buf) >= run_rows:
+                buf.sort(key=rank_key)      # Timsort: linear on already-ranked files
+                runs.append(_spill(buf, tmp_dir))
+                buf = []
+        buf.sort(key=rank_key)
+        if not runs:
+            yield from buf
+            return
+        logger.info(f"Export spilled {len(runs)} sorted runs to disk")
+        # heapq.merge is stable across runs, and runs are in input order
+        yield from merge_ranked(*(_read_run(f) for f in runs), iter(buf))
+    finally:
+        for f in runs:
+            f.close()
+
+
+# --- incremental writers ---
+def _numbered(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for i, row in enumerate(rows, 1):
+        yield {"No.": i, **row}
+
+
+def _chunks_csv(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=columns, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % FLUSH_ROWS == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+def _chunks_jsonl(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[bytes]:
+    lines: List[str] = []
+    for row in rows:
+        lines.append(json.dumps({k: row.get(k) for k in columns}, ensure_ascii=False))
+        if len(lines) >= FLUSH_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _chunks_parquet(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"No.": pa.int64(), "score": pa.int64()}
+    schema = pa.schema([(c, types.get(c, pa.string())) for c in columns])
+
+    def batch(group: List[Dict[str, Any]]):
+        return pa.Table.from_pylist(
+            [{c: (r.get(c) if c in types else str(r.get(c, ""))) for c in columns} for r in group],
+            schema=schema,
+        )
+
+    # Parquet's footer is written last, so build the file on disk one row
+    # group at a time, then stream it back.
+    with tempfile.TemporaryFile() as f:
+        with pq.ParquetWriter(f, schema) as writer:
+            group: List[Dict[str, Any]] = []
+            for row in rows:
+                group.append(row)
+                if len(group) >= FLUSH_ROWS:
+                    writer.write_table(batch(group))
+                    group = []
+            if group:
+                writer.write_table(batch(group))
+        f.seek(0)
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                return
+            yield chunk
+
+
+_WRITERS = {"csv": _chunks_csv, "jsonl": _chunks_jsonl, "parquet": _chunks_parquet}
+
+
+def check_format(fmt: str) -> None:
+    """Raise ValueError for unknown formats, or Parquet without pyarrow."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}; choose from {', '.join(FORMATS)}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("parquet export needs pyarrow (pip install pyarrow)")
+
+
+def write_rows(
+    rows: Iterable[Dict[str, Any]],
+    fmt: str = "csv",
+    numbered: bool = False,
+) -> Iterator[bytes]:
+    """Encode ranked rows incrementally; yields byte chunks."""
+    check_format(fmt)
+    columns = list(REQUIRED)
+    if numbered:
+        rows, columns = _numbered(rows), ["No."] + columns
+    return _WRITERS[fmt](rows, columns)
+
+
+def export_candidates(
+    path: str,
+    fmt: str = "csv",
+    filt: Optional[ExportFilter] = None,
+    numbered: bool = False,
+    run_rows: Optional[int] = None,
+) -> Iterator[bytes]:
+    """
+    Candidates CSV → filter → rank (external sort) → CSV / JSONL / Parquet
+    chunks. Memory is bounded by `run_rows` regardless of file size.
+    """
+    rows: Iterable[Dict[str, Any]] = read_candidates(path)
+    if filt is not None:
+        rows = filter(filt, rows)
+    # spill next to the data rather than to /tmp, which is often RAM-backed
+    return write_rows(external_sort(rows, run_rows, tmp_dir=os.path.dirname(path) or None), fmt, numbered)
@@ -1,41 +1,58 @@
 from typing import List, Dict, Any
 import os
-import pandas as pd
+import csv
 import shutil
 from datetime import datetime
 import logging
+from ..services.ranking import rank
+from ..settings import get_settings
 
 logger = logging.getLogger(__name__)
 
 DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "data"))
-os.makedirs(DATA_DIR, exist_ok=True)
 CSV_PATH = os.path.join(DATA_DIR, "candidates.csv")
 
+
+def data_dir() -> str:
+    """settings.data_dir (DATA_DIR env) if set, else the repo's data/ folder."""
+    return get_settings().data_dir or DATA_DIR
+
+
+def csv_path() -> str:
+    return os.path.join(data_dir(), "candidates.csv")
+
+
 REQUIRED = ["name","profile_type","summary","contacts","source_links","match_justification","tier","score"]
 
 def save_candidates_csv(items: List[Dict[str, Any]]) -> str:
+    out_dir, out_path = data_dir(), csv_path()
+    os.makedirs(out_dir, exist_ok=True)
     # Create backup if file exists
-    if os.path.exists(CSV_PATH):
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = os.path.join(DATA_DIR, f"candidates_backup_{timestamp}.csv")
+    if os.path.exists(out_path):
+        # microseconds: writes less than a second apart keep separate backups
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        backup_path = os.path.join(out_dir, f"candidates_backup_{timestamp}.csv")
         try:
-            shutil.copy2(CSV_PATH, backup_path)
+            shutil.copy2(out_path, backup_path)
             logger.info(f"Created backup: {backup_path}")
         except Exception as e:
             logger.warning(f"Failed to create backup: {e}")
 
-    rows = []
-    for c in items:
-        row = {k: (c.get(k) or "") for k in REQUIRED}
-        # stringify lists and ensure no None values
-        row["contacts"] = ";".join(str(x) for x in (c.get("contacts") or []) if x)
-        row["source_links"] = ";".join(str(x) for x in (c.get("source_links") or []) if x)
-        rows.append(row)
-
-    df = pd.DataFrame(rows)
-    if not df.empty:
-        df.sort_values(by=["tier","score"], ascending=[True, False], inplace=True)
-
-    df.to_csv(CSV_PATH, index=False)
-    logger.info(f"Saved {len(items)} candidates to {CSV_PATH}")
-    return CSV_PATH
\ No newline at end of file
+    # Tier → Score → Name. /search/batch passes merged ranked output (Timsort
+    # is linear on ordered input); /search passes its scored rows unranked,
+    # so the full sort happens here, in the writer thread rather than on the
+    # event loop. Rows are written as they are built (no DataFrame copy), to
+    # a temp file that replaces the CSV only once complete.
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REQUIRED, lineterminator="\n")
+        writer.writeheader()
+        for c in rank(items):
+            row = {k: (c.get(k) or "") for k in REQUIRED}
+            # stringify lists and ensure no None values
+            row["contacts"] = ";".join(str(x) for x in (c.get("contacts") or []) if x)
+            row["source_links"] = ";".join(str(x) for x in (c.get("source_links") or []) if x)
+            writer.writerow(row)
+    os.replace(tmp_path, out_path)
+    logger.info(f"Saved {len(items)} candidates to {out_path}")
+    return out_path
@@ -0,0 +1,157 @@
+import os
+import json
+import uuid
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from .repository import data_dir
+
+logger = logging.getLogger(__name__)
+
+
+def _write_json(path: str, data: Any) -> None:
+    """Atomic JSON write (temp file + rename) so readers never see half a file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str, default: Any) -> Any:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+class SavedSearchStore:
+    """
+    File-backed store for saved searches, their last snapshot (candidate_key
+    -> fingerprint + candidate) and an append-only JSONL delta feed per
+    saved search. All methods are blocking; call them from a worker thread
+    on the request path.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        snapshot_dir: Optional[str] = None,
+        delta_dir: Optional[str] = None,
+    ) -> None:
+        base = data_dir()
+        self.path = path or os.path.join(base, "saved_searches.json")
+        self.snapshot_dir = snapshot_dir or os.path.join(base, "snapshots")
+        self.delta_dir = delta_dir or os.path.join(base, "deltas")
+        self._lock = threading.Lock()
+
+    # --- saved search definitions ---
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        return _read_json(self.path, {})
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._load().values())
+
+    def get(self, search_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._load().get(search_id)
+
+    def create(self, name: str, criteria: Dict[str, Any], interval_minutes: int) -> Dict[str, Any]:
+        now = datetime.now()
+        saved = {
+            "id": uuid.uuid4().hex[:12],
+            "name": name,
+            "criteria": criteria,
+            "interval_minutes": interval_minutes,
+            "created_at": now.isoformat(),
+            "last_run_at": None,
+            "last_run_id": None,
+            "next_run_at": now.isoformat(),   # first run on the next scheduler tick
+            "last_seq": 0,
+            "runs": 0,
+        }
+        with self._lock:
+            data = self._load()
+            data[saved["id"]] = saved
+            _write_json(self.path, data)
+        return saved
+
+    def delete(self, search_id: str) -> bool:
+        with self._lock:
+            data = self._load()
+            if data.pop(search_id, None) is None:
+                return False
+            _write_json(self.path, data)
+            # under the lock, so a concurrent record_run cannot recreate them
+            for path in (self._snapshot_path(search_id), self._delta_path(search_id)):
+                if os.path.exists(path):
+                    os.remove(path)
+        return True
+
+    def due(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        now = (now or datetime.now()).isoformat()
+        return [s for s in self.list() if (s.get("next_run_at") or "") <= now]
+
+    # --- snapshots + delta feed ---
+    def _snapshot_path(self, search_id: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{search_id}.json")
+
+    def _delta_path(self, search_id: str) -> str:
+        return os.path.join(self.delta_dir, f"{search_id}.jsonl")
+
+    def load_snapshot(self, search_id: str) -> Dict[str, Dict[str, Any]]:
+        return _read_json(self._snapshot_path(search_id), {})
+
+    def record_run(
+        self,
+        search_id: str,
+        run_id: str,
+        snapshot: Dict[str, Dict[str, Any]],
+        events: List[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Append `events` to the delta feed (numbering them), replace the
+        snapshot and schedule the next run. Returns the updated saved search,
+        or None (writing nothing) if it was deleted while the run was going.
+        """
+        with self._lock:
+            data = self._load()
+            saved = data.get(search_id)
+            if saved is None:
+                return None
+            seq = saved.get("last_seq", 0)
+            if events:
+                os.makedirs(self.delta_dir, exist_ok=True)
+                with open(self._delta_path(search_id), "a", encoding="utf-8") as f:
+                    for ev in events:
+                        seq += 1
+                        ev["seq"] = seq
+                        f.write(json.dumps(ev, ensure_ascii=False) + "\n")
+            _write_json(self._snapshot_path(search_id), snapshot)
+
+            now = datetime.now()
+            saved.update(
+                last_run_at=now.isoformat(),
+                last_run_id=run_id,
+                next_run_at=(now + timedelta(minutes=saved["interval_minutes"])).isoformat(),
+                last_seq=seq,
+                runs=saved.get("runs", 0) + 1,
+            )
+            _write_json(self.path, data)
+            return saved
+
+    def iter_deltas(self, search_id: str, since: int = 0) -> Iterator[Dict[str, Any]]:
+        """Delta events with seq > since, oldest first."""
+        try:
+            f = open(self._delta_path(search_id), encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                ev = json.loads(line)
+                if ev["seq"] > since:
+                    yield ev
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from ..settings import get_settings
+from ..tracing import Span, current_span, span
+from .repository import save_candidates_csv
+
+logger = logging.getLogger(__name__)
+
+STORAGE_HISTORY = 1000  # finished jobs kept for the status endpoint
+
+
+@dataclass
+class WriteJob:
+    id: str
+    items: List[Dict[str, Any]] = field(repr=False)
+    count: int = 0
+    status: str = "pending"             # pending -> writing -> done | superseded | failed
+    durable: bool = False               # caller waits for its rows to reach disk
+    csv_path: Optional[str] = None
+    error: Optional[str] = None
+    batch_size: int = 0                 # how many jobs shared the write
+    submitted_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    finished_at: Optional[str] = None
+    trace_parent: Optional[Span] = field(default=None, repr=False)   # span of the submitting request
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "write_id": self.id,
+            "status": self.status,
+            "count": self.count,
+            "csv_path": self.csv_path,
+            "error": self.error,
+            "batch_size": self.batch_size,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class CsvWriter:
+    """
+    Single writer task that moves CSV writes off the event loop.
+    Searches enqueue a job and return immediately; the writer drains up to
+    `max_batch` queued jobs at a time. Every write replaces candidates.csv,
+    so a batch writes the newest job's rows; older jobs in it finish as
+    "superseded", with no csv_path, because their rows never reach disk.
+    Durable jobs (the caller waits on them) are never superseded: they are
+    written in order before the newest, each leaving its file as a backup.
+    The bounded queue applies backpressure when disk cannot keep up.
+    """
+
+    def __init__(
+        self,
+        write_fn: Callable[[List[Dict[str, Any]]], str] = save_candidates_csv,
+        max_queue: Optional[int] = None,
+        max_batch: Optional[int] = None,
+        history: int = STORAGE_HISTORY,
+    ) -> None:
+        settings = get_settings()
+        max_queue = settings.storage_queue_size if max_queue is None else max_queue
+        max_batch = settings.storage_max_batch if max_batch is None else max_batch
+        self.write_fn = write_fn
+        self.max_batch = max(1, max_batch)
+        self.history = history
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._jobs: "OrderedDict[str, WriteJob]" = OrderedDict()
+        self._done: Dict[str, asyncio.Event] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything queued, then stop the writer task."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, items: List[Dict[str, Any]], durable: bool = False) -> WriteJob:
+        self.start()
+        job = WriteJob(id=uuid.uuid4().hex, items=items, count=len(items), durable=durable,
+                       trace_parent=current_span())
+        self._jobs[job.id] = job
+        self._done[job.id] = asyncio.Event()
+        self._trim()
+        await self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[WriteJob]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> Optional[WriteJob]:
+        event = self._done.get(job_id)
+        if event is not None:
+            await event.wait()
+        return self._jobs.get(job_id)
+
+    def _trim(self) -> None:
+        while len(self._jobs) > self.history:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.status in ("pending", "writing"):
+                break
+            self._jobs.popitem(last=False)
+            self._done.pop(oldest.id, None)
+
+    def _write_batch(self, batch: List[WriteJob]) -> None:
+        # Runs in a worker thread.
+        last = batch[-1]
+        writes = [job for job in batch[:-1] if job.durable] + [last]
+        superseded = [job for job in batch[:-1] if not job.durable]
+        # linked to the request that queued the newest rows, even though it ends later
+        with span("storage.write", parent=last.trace_parent, write_id=last.id, count=last.count,
+                  batch_size=len(batch), writes=len(writes), superseded=len(superseded)) as sp:
+            for job in writes:
+                try:
+                    job.csv_path = self.write_fn(job.items)
+                    job.status = "done"
+                except Exception as e:
+                    logger.error("Candidate write failed", extra={'write_id': job.id, 'error': str(e)})
+                    sp.error = str(e)
+                    job.status = "failed"
+                    job.error = str(e)
+            for job in superseded:
+                if last.status == "done":
+                    job.status = "superseded"
+                else:
+                    job.status = "failed"
+                    job.error = last.error
+        finished = datetime.now().isoformat()
+        for job in batch:
+            job.trace_parent = None
+            job.finished_at = finished
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            for job in batch:
+                job.status = "writing"
+                job.batch_size = len(batch)
+            try:
+                await loop.run_in_executor(None, self._write_batch, batch)
+            finally:
+                for job in batch:
+                    if job.status == "writing":   # cancelled mid-write
+                        job.status = "failed"
+                        job.error = "writer stopped"
+                    job.items = []                # release memory once durable
+                    self._done[job.id].set()
+                    self._queue.task_done()
+            logger.info(f"Wrote candidate batch of {len(batch)} queued job(s)")
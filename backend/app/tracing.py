@@ -0,0 +1,329 @@
+import os
+import json
+import time
+import queue
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+SERVICE_NAME = "pioneers-founder-scout"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    sampled: bool = True
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attributes.update(attrs)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return f"{random.getrandbits(nbytes * 8):0{nbytes * 2}x}"
+
+
+def _sampled(trace_id: str, rate: float) -> bool:
+    """Deterministic per trace, so a trace's spans and logs are kept together."""
+    return int(trace_id[:8], 16) / 0xFFFFFFFF < rate
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def set_attributes(**attrs: Any) -> None:
+    """Add attributes to the active span, if any."""
+    s = _current.get()
+    if s is not None:
+        s.set(**attrs)
+
+
+def start_span(name: str, parent: Optional[Span] = None, **attrs: Any) -> Span:
+    """
+    Create a span without activating or ending it. For spans that outlive
+    the code that starts them (e.g. until a streamed body is sent): activate
+    with use_span() and finish with end_span(). Otherwise use span().
+    """
+    parent = parent if parent is not None else _current.get()
+    if parent is None:
+        trace_id = _new_id(16)
+        s = Span(name, trace_id, _new_id(8), sampled=_sampled(trace_id, _state.sample_rate))
+    else:
+        s = Span(name, parent.trace_id, _new_id(8), parent.span_id, parent.sampled)
+    s.attributes.update(attrs)
+    return s
+
+
+def end_span(s: Span) -> None:
+    s.end_ns = time.time_ns()
+    if s.sampled and _state.exporter is not None:
+        _state.exporter.submit(s)
+
+
+@contextmanager
+def use_span(s: Span) -> Iterator[Span]:
+    """Make `s` the active span in this block (without ending it)."""
+    token = _current.set(s)
+    try:
+        yield s
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, parent: Optional[Span] = None, **attrs: Any) -> Iterator[Span]:
+    """
+    Start a span as a child of `parent` (default: the active span), or a new
+    trace if there is none. Works in sync and async code alike: the active
+    span lives in a ContextVar, so each asyncio task sees its own.
+    """
+    s = start_span(name, parent, **attrs)
+    try:
+        with use_span(s):
+            yield s
+    except BaseException as e:
+        s.error = repr(e)
+        raise
+    finally:
+        end_span(s)
+
+
+# --- OTLP/JSON encoding ---
+def _otlp_value(v: Any) -> Dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    if isinstance(v, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(x) for x in v]}}
+    return {"stringValue": str(v)}
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """Encode spans as an OTLP/JSON ExportTraceServiceRequest."""
+    encoded = []
+    for s in spans:
+        item = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items() if v is not None],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            item["parentSpanId"] = s.parent_id
+        encoded.append(item)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "backend.app"}, "spans": encoded}],
+    }]}
+
+
+# --- exporters ---
+class SpanExporter:
+    """
+    Batches finished spans on a daemon thread so exporting never blocks the
+    event loop. Subclasses implement `export(spans)`.
+    """
+
+    def __init__(self, max_batch: int = 256, flush_seconds: float = 2.0) -> None:
+        self.max_batch = max_batch
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, s: Span) -> None:
+        try:
+            self._queue.put_nowait(s)
+        except queue.Full:
+            pass  # drop rather than slow down requests
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+    def _run(self) -> None:
+        batch: List[Span] = []
+        deadline = time.monotonic() + self.flush_seconds
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = False
+            if item is None:
+                self._flush(batch)
+                return
+            if item is not False:
+                batch.append(item)
+            if len(batch) >= self.max_batch or (item is False and batch):
+                self._flush(batch)
+                batch = []
+            if item is False:
+                deadline = time.monotonic() + self.flush_seconds
+
+    def _flush(self, batch: List[Span]) -> None:
+        if not batch:
+            return
+        try:
+            self.export(batch)
+        except Exception as e:
+            logger.warning(f"Span export failed: {e}")
+
+
+class FileSpanExporter(SpanExporter):
+    """One OTLP/JSON request per line (readable by `otelcol` file receivers and jq)."""
+
+    def __init__(self, path: str, **kwargs: Any) -> None:
+        self.path = path
+        super().__init__(**kwargs)
+
+    def export(self, spans: List[Span]) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(to_otlp(spans)) + "\n")
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """POST OTLP/JSON to a collector, e.g. http://localhost:4318/v1/traces."""
+
+    def __init__(self, endpoint: str, **kwargs: Any) -> None:
+        self.endpoint = endpoint
+        super().__init__(**kwargs)
+
+    def export(self, spans: List[Span]) -> None:
+        import urllib.request
+        req = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(to_otlp(spans)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=5):
+            pass
+
+
+class _State:
+    exporter: Optional[SpanExporter] = None
+    sample_rate: float = 1.0
+
+
+_state = _State()
+
+
+# --- structured logging ---
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including `extra={...}` fields and trace ids."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out: Dict[str, Any] = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        s = _current.get()
+        if s is not None:
+            out["trace_id"] = s.trace_id
+            out["span_id"] = s.span_id
+        for k, v in record.__dict__.items():
+            if k not in _RESERVED and not k.startswith("_"):
+                out[k] = v
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str)
+
+
+class LogSampler(logging.Filter):
+    """
+    Keep every WARNING+ record; keep INFO/DEBUG at `rate`. Inside a trace
+    the decision follows the trace id, so a sampled request logs fully.
+    """
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        s = _current.get()
+        if s is not None:
+            return _sampled(s.trace_id, self.rate)
+        return random.random() < self.rate
+
+
+def configure_logging(log_format: str = "json", level: str = "INFO", sample_rate: float = 1.0) -> None:
+    handler = logging.StreamHandler()
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    handler.addFilter(LogSampler(sample_rate))
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        if getattr(h, "_founder_scout", False):
+            root.removeHandler(h)
+    handler._founder_scout = True
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def set_exporter(exporter: Optional[SpanExporter], sample_rate: float = 1.0) -> None:
+    """Replace (and flush) the active exporter; None disables span export."""
+    shutdown()
+    _state.exporter = exporter
+    _state.sample_rate = sample_rate
+
+
+def configure(settings: Any) -> None:
+    """Set up span export + logging from Settings (called from the lifespan)."""
+    exporter: Optional[SpanExporter] = None
+    if settings.trace_export == "file":
+        path = settings.trace_file
+        if not path:
+            from .storage.repository import data_dir
+            path = os.path.join(data_dir(), "traces.jsonl")
+        exporter = FileSpanExporter(path)
+    elif settings.trace_export == "otlp":
+        exporter = OtlpHttpSpanExporter(settings.trace_otlp_endpoint)
+    set_exporter(exporter, settings.trace_sample_rate)
+    configure_logging(settings.log_format, settings.log_level, settings.log_sample_rate)
+
+
+def shutdown() -> None:
+    """Flush and stop the exporter."""
+    if _state.exporter is not None:
+        _state.exporter.shutdown()
+        _state.exporter = None
@@ -1,5 +1,8 @@
 
 import os
+import sys
+from urllib.parse import urlencode
+
 import pandas as pd
 import streamlit as st
 
@@ -29,8 +32,15 @@ st.markdown(
 )
 
 # ---------- Paths ----------
+# Same CSV the backend writes and exports (honours DATA_DIR / .env)
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-csv_path = os.path.join(BASE_DIR, "data", "candidates.csv")
+sys.path.insert(0, BASE_DIR)
+from backend.app.storage.export import FORMATS, ExportFilter, export_candidates  # noqa: E402
+from backend.app.storage.repository import REQUIRED, csv_path as backend_csv_path  # noqa: E402
+
+csv_path = backend_csv_path()
+# Backend address as the *browser* sees it. Unset: downloads are built here.
+BACKEND_PUBLIC_URL = os.getenv("BACKEND_PUBLIC_URL", "").rstrip("/")
 st.caption(f"Reading: {csv_path}")
 
 # ---------- Refresh ----------
@@ -41,16 +51,50 @@ if not os.path.exists(csv_path):
     st.info("No candidates.csv found. Run the backend /search.")
     st.stop()
 
-# ---------- Load ----------
-df = pd.read_csv(csv_path)
+# ---------- Load (ranked once per file version) ----------
+TIER_ORDER = {"A": 1, "B": 2, "C": 3}
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_ranked(path: str, mtime: float) -> pd.DataFrame:
+    """
+    Read, clean and rank (Tier → Score → Name) the CSV once per file version.
+    The backend already writes rows in this order, so the sort is skipped
+    when the file is ranked; filters below keep the order, so reruns never
+    sort again. Cached as a shared resource (not copied on every rerun, only
+    the latest version kept); the frame must not be modified in place.
+    """
+    data = pd.read_csv(path, usecols=lambda c: c in REQUIRED)
+
+    # Basic cleaning for display / operations
+    for col in ["name", "profile_type", "summary", "contacts", "source_links", "match_justification", "tier", "score"]:
+        if col in data.columns:
+            data[col] = data[col].fillna("")
+
+    if "score" in data.columns:
+        data["score"] = pd.to_numeric(data["score"], errors="coerce").fillna(0).astype(int)
+
+    # Normalize tier + score defensively
+    if "tier" not in data.columns:
+        data["tier"] = ""
+    if "score" not in data.columns:
+        data["score"] = 0
+    if "name" not in data.columns:
+        data["name"] = ""  # safety
+    data["tier"] = data["tier"].astype(str).str.strip().str.upper().replace({"NONE": ""})
+
+    tier_rank = data["tier"].map(TIER_ORDER).fillna(9).astype(int)
+    order = pd.MultiIndex.from_arrays([tier_rank, -data["score"], data["name"].astype(str)])
+    if not order.is_monotonic_increasing:
+        data = (
+            data.assign(tier_rank=tier_rank)
+                .sort_values(by=["tier_rank", "score", "name"], ascending=[True, False, True], kind="mergesort")
+                .drop(columns=["tier_rank"])
+        )
+    return data.reset_index(drop=True)
 
-# Basic cleaning for display / operations
-for col in ["name", "profile_type", "summary", "contacts", "source_links", "match_justification", "tier", "score"]:
-    if col in df.columns:
-        df[col] = df[col].fillna("")
 
-if "score" in df.columns:
-    df["score"] = pd.to_numeric(df["score"], errors="coerce").fillna(0).astype(int)
+df = load_ranked(csv_path, os.path.getmtime(csv_path))
 
 # ---------- Sidebar Filters ----------
 with st.sidebar:
@@ -75,14 +119,8 @@ with st.sidebar:
     sel_types = st.multiselect("Profile type", options=types_all, key="sel_types")
     text_q = st.text_input("Text search (name/summary/justification)", key="text_q").strip().lower()
 
-# ---------- Apply Filters ----------
-fdf = df.copy()
-
-# Normalize tier + score defensively
-if "tier" in fdf.columns:
-    fdf["tier"] = fdf["tier"].astype(str).str.strip().str.upper().replace({"NONE": ""})
-if "score" in fdf.columns:
-    fdf["score"] = pd.to_numeric(fdf["score"], errors="coerce").fillna(0).astype(int)
+# ---------- Apply Filters (order is preserved: df is already ranked) ----------
+fdf = df
 
 # Tier filter
 if "tier" in fdf.columns and st.session_state.get("sel_tiers"):
@@ -100,19 +138,10 @@ if text_q_val:
         + fdf.get("summary", "").astype(str) + " "
         + fdf.get("match_justification", "").astype(str)
     ).str.lower()
-    fdf = fdf[hay.str.contains(text_q_val, na=False)]
-
-# ---------- Sort: Tier → Score → Name ----------
-tier_order = {"A": 1, "B": 2, "C": 3}
-fdf["tier_rank"] = fdf["tier"].map(tier_order).fillna(9).astype(int)
-if "name" not in fdf.columns:
-    fdf["name"] = ""  # safety
-
-fdf = (
-    fdf.sort_values(by=["tier_rank", "score", "name"], ascending=[True, False, True], kind="mergesort")
-      .drop(columns=["tier_rank"], errors="ignore")
-      .reset_index(drop=True)
-)
+    # plain substring, like the export's filter
+    fdf = fdf[hay.str.contains(text_q_val, na=False, regex=False)]
+
+fdf = fdf.reset_index(drop=True)
 
 # ---------- Summary Bar (filtered view) ----------
 total_count = len(df)
@@ -133,13 +162,34 @@ if "No." in numbered.columns:
 numbered.insert(0, "No.", range(1, len(numbered) + 1))
 
 # ---------- Download (use the same view the user sees) ----------
-st.download_button(
-    label="📥 Download filtered CSV",
-    data=numbered.to_csv(index=False).encode("utf-8"),
-    file_name="candidates_filtered.csv",
-    mime="text/csv",
+# Same ranked export as the backend's /candidates/export (external sort,
+# fixed memory while sorting). With BACKEND_PUBLIC_URL the browser streams
+# it from the backend; otherwise it is built here on request, so downloads
+# work wherever the dashboard is opened from.
+export_filter = ExportFilter(
+    tiers=st.session_state.get("sel_tiers") or None,
+    profile_types=st.session_state.get("sel_types") or None,
+    q=text_q_val,
 )
 
+d1, d2, d3 = st.columns(3)
+for col, fmt, label in ((d1, "csv", "CSV"), (d2, "jsonl", "JSONL"), (d3, "parquet", "Parquet")):
+    if BACKEND_PUBLIC_URL:
+        export_params = [("numbered", "true"), ("format", fmt)]
+        export_params += [("tier", t) for t in export_filter.tiers or []]
+        export_params += [("profile_type", t) for t in export_filter.profile_types or []]
+        if text_q_val:
+            export_params.append(("q", text_q_val))
+        col.link_button(
+            f"📥 Download filtered {label}",
+            f"{BACKEND_PUBLIC_URL}/candidates/export?" + urlencode(export_params),
+        )
+    elif col.button(f"Prepare filtered {label}", key=f"export_{fmt}"):
+        media_type, ext = FORMATS[fmt]
+        with st.spinner(f"Building {label} export..."):
+            data = b"".join(export_candidates(csv_path, fmt, export_filter, numbered=True))
+        col.download_button(f"📥 Download filtered {label}", data, file_name=f"candidates.{ext}", mime=media_type)
+
 # ---------- Tier A cards ----------
 st.subheader(f"📋 Candidates ({len(numbered)} found)")
 
@@ -0,0 +1,188 @@
+"""
+Local stand-in for HarvestAPI, for load tests and offline development.
+
+Serves /linkedin/profile-search and /linkedin/geo-id-search with
+configurable latency, error rate and page size, and optional per-key
+limits (accepted keys, quota, rate) to exercise the app's key pool.
+Profiles are drawn from a fixed, seeded population, so the same query
+always returns the same page and different queries overlap the way real
+searches do (dedupe has work to do).
+
+    python scripts/harvest_simulator.py --port 9100 --latency-ms 250 --error-rate 0.02
+    HARVEST_BASE_URL=http://127.0.0.1:9100 HARVEST_API_KEY=sim uvicorn backend.app.main:app
+
+    # two keys, 2 req/s and 500 requests each; any other key gets 401
+    python scripts/harvest_simulator.py --keys k1,k2 --key-rate 2 --key-quota 500
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+POSITIONS = [
+    "Founder & CEO", "CTO & Co-Founder", "Co-founder, machine learning", "Head of Data",
+    "Founder · AI startup", "Senior Software Engineer", "VP Sales", "PhD researcher, NLP",
+    "Product Manager", "Serial entrepreneur, 10 years in fintech",
+]
+CITIES = ["Lisbon", "Porto", "Berlin", "Paris", "London", "Madrid", "Amsterdam", "Remote"]
+
+
+@dataclass
+class SimConfig:
+    latency_ms: float = 150.0       # mean response time per page
+    jitter_ms: float = 50.0         # uniform +/- jitter
+    geo_latency_ms: float = 50.0
+    error_rate: float = 0.0         # fraction of requests answered with error_status
+    error_status: int = 500
+    results: int = 30               # elements per page (real Harvest: up to ~30)
+    population: int = 5000          # distinct profiles queries draw from
+    seed: int = 0
+    keys: Tuple[str, ...] = ()      # accepted X-API-Key values; empty = any
+    key_quota: int = 0              # requests per key, then 429; 0 = unlimited
+    key_rate: float = 0.0           # requests/second per key, then 429 + Retry-After; 0 = unlimited
+
+
+def _rng(cfg: SimConfig, *parts: Any) -> random.Random:
+    digest = hashlib.sha1("|".join(str(p) for p in (cfg.seed,) + parts).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def profile(i: int) -> Dict[str, Any]:
+    return {
+        "name": f"Sim Person {i}",
+        "publicIdentifier": f"sim-person-{i}",
+        "position": POSITIONS[i % len(POSITIONS)],
+        "linkedinUrl": f"https://www.linkedin.com/in/sim-person-{i}",
+        "location": {"linkedinText": CITIES[(i // len(POSITIONS)) % len(CITIES)]},
+    }
+
+
+def build_app(cfg: SimConfig) -> FastAPI:
+    app = FastAPI(title="Harvest simulator")
+    app.state.config = cfg
+    app.state.requests = 0
+    app.state.errors = 0
+    app.state.keys = {}             # key -> {"requests", "rejected", "tokens", "updated"}
+
+    async def delay(mean_ms: float) -> None:
+        ms = max(0.0, mean_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms))
+        await asyncio.sleep(ms / 1000)
+
+    def maybe_fail() -> Optional[JSONResponse]:
+        if cfg.error_rate and random.random() < cfg.error_rate:
+            app.state.errors += 1
+            return JSONResponse({"error": "simulated failure"}, status_code=cfg.error_status)
+        return None
+
+    def check_key(request: Request) -> Optional[JSONResponse]:
+        if not (cfg.keys or cfg.key_quota or cfg.key_rate):
+            return None
+        key = request.headers.get("X-API-Key", "")
+        if cfg.keys and key not in cfg.keys:
+            return JSONResponse({"error": "invalid API key"}, status_code=401)
+        now = time.monotonic()
+        st = app.state.keys.setdefault(key, {"requests": 0, "rejected": 0, "tokens": max(1.0, cfg.key_rate), "updated": now})
+        retry_after = None
+        if cfg.key_quota and st["requests"] >= cfg.key_quota:
+            retry_after = 3600
+        elif cfg.key_rate:
+            st["tokens"] = min(max(1.0, cfg.key_rate), st["tokens"] + (now - st["updated"]) * cfg.key_rate)
+            st["updated"] = now
+            if st["tokens"] < 1:
+                retry_after = math.ceil((1 - st["tokens"]) / cfg.key_rate)
+            else:
+                st["tokens"] -= 1
+        if retry_after is not None:
+            st["rejected"] += 1
+            return JSONResponse({"error": "rate limit exceeded"}, status_code=429,
+                                headers={"Retry-After": str(retry_after)})
+        st["requests"] += 1
+        return None
+
+    @app.get("/linkedin/profile-search")
+    async def profile_search(request: Request):
+        app.state.requests += 1
+        rejected = check_key(request)
+        if rejected is not None:
+            return rejected
+        await delay(cfg.latency_ms)
+        failed = maybe_fail()
+        if failed is not None:
+            return failed
+        q = request.query_params
+        page = int(q.get("page", "1"))
+        rng = _rng(cfg, q.get("search", ""), q.get("title", ""), q.get("geoId", ""), q.get("location", ""), page)
+        ids = rng.sample(range(cfg.population), min(cfg.results, cfg.population))
+        elements: List[Dict[str, Any]] = [profile(i) for i in ids]
+        return {"elements": elements, "pagination": {"pageNumber": page, "totalPages": 100}}
+
+    @app.get("/linkedin/geo-id-search")
+    async def geo_search(request: Request, search: str = ""):
+        app.state.requests += 1
+        rejected = check_key(request)
+        if rejected is not None:
+            return rejected
+        await delay(cfg.geo_latency_ms)
+        failed = maybe_fail()
+        if failed is not None:
+            return failed
+        geo_id = str(100000000 + _rng(cfg, "geo", search.lower()).randrange(900000000))
+        return {"elements": [{"geoId": geo_id, "title": search}]}
+
+    @app.get("/_sim/stats")
+    async def stats():
+        out = {"requests": app.state.requests, "errors": app.state.errors}
+        if app.state.keys:
+            out["keys"] = {k[-4:]: {"requests": v["requests"], "rejected": v["rejected"]}
+                           for k, v in app.state.keys.items()}
+        return out
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Simulator flags, shared with scripts/loadtest.py."""
+    d = SimConfig()
+    parser.add_argument("--latency-ms", type=float, default=d.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=d.jitter_ms)
+    parser.add_argument("--geo-latency-ms", type=float, default=d.geo_latency_ms)
+    parser.add_argument("--error-rate", type=float, default=d.error_rate)
+    parser.add_argument("--error-status", type=int, default=d.error_status)
+    parser.add_argument("--results", type=int, default=d.results)
+    parser.add_argument("--population", type=int, default=d.population)
+    parser.add_argument("--seed", type=int, default=d.seed)
+    parser.add_argument("--keys", default="", help="comma-separated accepted API keys (default: any)")
+    parser.add_argument("--key-quota", type=int, default=d.key_quota)
+    parser.add_argument("--key-rate", type=float, default=d.key_rate)
+
+
+def config_from_args(args: argparse.Namespace) -> SimConfig:
+    return SimConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, geo_latency_ms=args.geo_latency_ms,
+        error_rate=args.error_rate, error_status=args.error_status, results=args.results,
+        population=args.population, seed=args.seed,
+        keys=tuple(k.strip() for k in args.keys.split(",") if k.strip()),
+        key_quota=args.key_quota, key_rate=args.key_rate,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(build_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
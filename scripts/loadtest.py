@@ -0,0 +1,466 @@
+"""
+Load test: the real FastAPI app (one uvicorn worker) against the local
+Harvest simulator.
+
+Starts scripts/harvest_simulator.py and the app as subprocesses, drives a
+weighted request mix with N concurrent clients per level, and reports
+throughput, p50/p95/p99 latency per request type, error rate, server
+event-loop lag and RSS. Results are saved as JSON so runs can be compared:
+
+    python scripts/loadtest.py --concurrency 1,4,16,64 --duration 20
+    HARVEST_CONCURRENCY=8 python scripts/loadtest.py --concurrency 1,4,16,64 \\
+        --duration 20 --compare data/loadtest/<previous>.json
+
+App settings come from the environment as usual (or --env KEY=VALUE), so
+compare runs by changing e.g. HARVEST_CONCURRENCY or BATCH_EXECUTOR.
+Candidate CSVs and saved-search state go to a temporary DATA_DIR.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+import tempfile
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS)
+
+import harvest_simulator  # noqa: E402
+
+DEFAULT_MIX = "search=6,batch=1,saved=1,status=2,export=1,rules=1"
+RESULTS_DIR = os.path.join(ROOT, "data", "loadtest")
+SECTORS = ["Lisbon", "Porto", "Berlin", "Paris", "London", "Madrid", "Amsterdam", ""]
+
+
+# --- stats helpers ---
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    v = sorted(values)
+    return {
+        "count": len(v),
+        "mean": round(sum(v) / len(v), 2) if v else 0.0,
+        "p50": round(percentile(v, 50), 2),
+        "p95": round(percentile(v, 95), 2),
+        "p99": round(percentile(v, 99), 2),
+        "max": round(v[-1], 2) if v else 0.0,
+    }
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPS:
+            raise ValueError(f"unknown request type {name!r}; choose from {', '.join(OPS)}")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("request mix needs at least one positive weight")
+    return mix
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# --- server side: the app plus a loop-lag / memory probe ---
+class LoopMonitor:
+    """Samples event-loop lag (sleep overshoot) and RSS inside the app process."""
+
+    def __init__(self, interval: float = 0.02) -> None:
+        self.interval = interval
+        self.lag_ms: deque = deque(maxlen=200_000)
+        self.peak_rss = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def reset(self) -> None:
+        self.lag_ms.clear()
+        self.peak_rss = rss_mb()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        ticks = 0
+        while True:
+            t = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag_ms.append(max(0.0, (loop.time() - t - self.interval) * 1000))
+            ticks += 1
+            if ticks % 10 == 0:
+                self.peak_rss = max(self.peak_rss, rss_mb())
+
+    def stats(self) -> Dict[str, Any]:
+        current = rss_mb()
+        return {
+            "loop_lag_ms": summarize(list(self.lag_ms)),
+            "rss_mb": round(current, 1),
+            "peak_rss_mb": round(max(self.peak_rss, current), 1),
+        }
+
+
+def serve(port: int) -> None:
+    """Run the real app with /_loadtest/* probe routes (internal; see --serve)."""
+    sys.path.insert(0, ROOT)
+    import uvicorn
+    from backend.app.main import app
+
+    monitor = LoopMonitor()
+
+    @app.post("/_loadtest/reset")
+    async def loadtest_reset():
+        monitor.start()
+        monitor.reset()
+        return monitor.stats()
+
+    @app.get("/_loadtest/stats")
+    async def loadtest_stats():
+        return monitor.stats()
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# --- client side: request mix ---
+class Session:
+    """State shared by the virtual users (saved search id, recent write ids)."""
+
+    def __init__(self, client: Any, seed: int = 0) -> None:
+        self.client = client
+        self.rng = random.Random(seed)
+        self.write_ids: deque = deque(maxlen=100)
+        self.saved_id: Optional[str] = None
+
+    def criteria(self) -> Dict[str, Any]:
+        return {
+            "sector": self.rng.choice(SECTORS),
+            "technical_signal": self.rng.random() < 0.7,
+            "founder_signal": True,
+            "min_years_experience": self.rng.choice([0, 3, 5]),
+        }
+
+    async def setup(self) -> None:
+        r = await self.client.post("/saved-searches", json={
+            "name": "loadtest", "criteria": self.criteria(), "interval_minutes": 1440,
+        })
+        r.raise_for_status()
+        self.saved_id = r.json()["id"]
+
+
+async def op_search(s: Session):
+    r = await s.client.post("/search", json=s.criteria())
+    if r.status_code == 200 and r.json().get("write_id"):
+        s.write_ids.append(r.json()["write_id"])
+    return r
+
+
+async def op_batch(s: Session):
+    return await s.client.post("/search/batch", json={
+        "criteria": [s.criteria() for _ in range(3)], "top_n": 10,
+    })
+
+
+async def op_saved(s: Session):
+    return await s.client.post(f"/saved-searches/{s.saved_id}/run")
+
+
+async def op_status(s: Session):
+    if not s.write_ids:
+        return await s.client.get("/health")
+    return await s.client.get(f"/storage/writes/{s.rng.choice(s.write_ids)}")
+
+
+async def op_export(s: Session):
+    if not s.write_ids:     # nothing written to export yet
+        return await s.client.get("/health")
+    fmt = s.rng.choice(["csv", "jsonl"])
+    async with s.client.stream("GET", "/candidates/export", params={"format": fmt, "tier": ["A", "B"]}) as r:
+        async for _ in r.aiter_bytes():
+            pass
+    return r
+
+
+async def op_rules(s: Session):
+    return await s.client.get("/scoring/rules")
+
+
+async def op_health(s: Session):
+    return await s.client.get("/health")
+
+
+OPS: Dict[str, Callable[[Session], Awaitable[Any]]] = {
+    "search": op_search,
+    "batch": op_batch,
+    "saved": op_saved,
+    "status": op_status,
+    "export": op_export,
+    "rules": op_rules,
+    "health": op_health,
+}
+
+
+async def run_level(
+    session: Session,
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> Dict[str, Any]:
+    """Closed loop: `concurrency` clients issue requests back to back."""
+    names, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = {n: [] for n in names}
+    errors: Dict[str, int] = {n: 0 for n in names}
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop = measure_from + duration
+
+    async def user() -> None:
+        while time.perf_counter() < stop:
+            name = session.rng.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                r = await OPS[name](session)
+                failed = r.status_code >= 400
+            except Exception:
+                failed = True
+            t1 = time.perf_counter()
+            if t0 >= measure_from:
+                latencies[name].append((t1 - t0) * 1000)
+                errors[name] += failed
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - measure_from
+    total = sum(len(v) for v in latencies.values())
+    all_latencies = [x for v in latencies.values() for x in v]
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "requests": total,
+        "rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        "error_rate": round(sum(errors.values()) / total, 4) if total else 0.0,
+        "latency_ms": summarize(all_latencies),
+        "ops": {
+            n: {**summarize(latencies[n]), "errors": errors[n]}
+            for n in names if latencies[n]
+        },
+    }
+
+
+# --- process management ---
+def _free_port() -> int:
+    import socket
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    import httpx
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{proc.args} exited with {proc.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def start_processes(args: argparse.Namespace, data_dir: str) -> Dict[str, Any]:
+    sim_port, app_port = _free_port(), _free_port()
+    sim_cmd = [sys.executable, os.path.join(SCRIPTS, "harvest_simulator.py"), "--port", str(sim_port)]
+    for flag in ("latency_ms", "jitter_ms", "geo_latency_ms", "error_rate", "error_status",
+                 "results", "population", "seed", "keys", "key_quota", "key_rate"):
+        sim_cmd += [f"--{flag.replace('_', '-')}", str(getattr(args, flag))]
+    sim = subprocess.Popen(sim_cmd, cwd=ROOT)
+
+    env = dict(os.environ)
+    if args.keys:
+        env["HARVEST_API_KEYS"] = args.keys     # the app's pool uses the simulator's keys
+    env.update({
+        "HARVEST_BASE_URL": f"http://127.0.0.1:{sim_port}",
+        "HARVEST_API_KEY": env.get("HARVEST_API_KEY") or "loadtest",
+        "SCHEDULER_ENABLED": "0",
+        "DATA_DIR": data_dir,
+        "LOG_LEVEL": env.get("LOG_LEVEL", "WARNING"),
+    })
+    env.update(dict(kv.split("=", 1) for kv in args.env))
+    app = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", str(app_port)], cwd=ROOT, env=env)
+
+    procs = {"sim": sim, "app": app, "sim_url": f"http://127.0.0.1:{sim_port}",
+             "app_url": f"http://127.0.0.1:{app_port}"}
+    try:
+        _wait_ready(procs["sim_url"] + "/_sim/stats", sim)
+        _wait_ready(procs["app_url"] + "/health", app)
+    except Exception:
+        stop_processes(procs)
+        raise
+    return procs
+
+
+def stop_processes(procs: Dict[str, Any]) -> None:
+    for name in ("app", "sim"):
+        proc = procs[name]
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# --- reporting ---
+def print_level(level: Dict[str, Any]) -> None:
+    server = level.get("server") or {}
+    lag = server.get("loop_lag_ms") or {}
+    lat = level["latency_ms"]
+    print(f"c={level['concurrency']:<4} {level['rps']:>8.2f} req/s  err {level['error_rate']:6.2%}  "
+          f"p50 {lat['p50']:>8.1f}  p95 {lat['p95']:>8.1f}  p99 {lat['p99']:>8.1f} ms  "
+          f"loop lag p99 {lag.get('p99', 0):>6.1f} max {lag.get('max', 0):>7.1f} ms  "
+          f"rss {server.get('peak_rss_mb', 0):>6.1f} MB")
+    for name, op in level["ops"].items():
+        print(f"    {name:<8} n={op['count']:<6} err={op['errors']:<4} "
+              f"p50 {op['p50']:>8.1f}  p95 {op['p95']:>8.1f}  p99 {op['p99']:>8.1f} ms")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Per concurrency level: throughput and p95/p99 change vs a previous run."""
+    def pct(new: float, old: float) -> str:
+        return f"{(new - old) / old:+.1%}" if old else "n/a"
+
+    before = {lv["concurrency"]: lv for lv in baseline.get("levels", [])}
+    lines = []
+    for lv in current["levels"]:
+        old = before.get(lv["concurrency"])
+        if old is None:
+            continue
+        lines.append(
+            f"c={lv['concurrency']:<4} rps {old['rps']:.2f} -> {lv['rps']:.2f} ({pct(lv['rps'], old['rps'])})  "
+            f"p95 {old['latency_ms']['p95']:.1f} -> {lv['latency_ms']['p95']:.1f} ms "
+            f"({pct(lv['latency_ms']['p95'], old['latency_ms']['p95'])})  "
+            f"p99 {old['latency_ms']['p99']:.1f} -> {lv['latency_ms']['p99']:.1f} ms "
+            f"({pct(lv['latency_ms']['p99'], old['latency_ms']['p99'])})"
+        )
+    return lines
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+async def run(args: argparse.Namespace, app_url: str, mix: Dict[str, float]) -> List[Dict[str, Any]]:
+    import httpx
+
+    levels = []
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=app_url, timeout=args.timeout, limits=limits) as client:
+        session = Session(client, seed=args.seed)
+        if "saved" in mix:
+            await session.setup()
+        for concurrency in args.concurrency:
+            probe = (await client.post("/_loadtest/reset")).status_code == 200
+            level = await run_level(session, mix, concurrency, args.duration, args.warmup)
+            if probe:
+                level["server"] = (await client.get("/_loadtest/stats")).json()
+            print_level(level)
+            levels.append(level)
+    return levels
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,4,16",
+                        type=lambda v: [int(x) for x in v.split(",")],
+                        help="comma-separated concurrency levels to sweep")
+    parser.add_argument("--duration", type=float, default=15.0, help="measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted request types (default {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--app-url", help="test an already running app instead of starting one "
+                                          "(no loop-lag/RSS numbers unless started by this script)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the app process")
+    parser.add_argument("--out", help=f"results file (default {RESULTS_DIR}/loadtest_<time>.json)")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    harvest_simulator.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.serve)
+        return {}
+
+    mix = parse_mix(args.mix)
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as data_dir:
+        procs = None if args.app_url else start_processes(args, data_dir)
+        try:
+            app_url = args.app_url or procs["app_url"]
+            levels = asyncio.run(run(args, app_url, mix))
+        finally:
+            if procs:
+                stop_processes(procs)
+
+    result = {
+        "meta": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "mix": mix,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "simulator": vars(harvest_simulator.config_from_args(args)),
+            "env": {k: v for k, v in os.environ.items()
+                    if k.startswith(("HARVEST_CONCURRENCY", "HARVEST_KEY_", "HARVEST_LANE_", "BATCH_", "STORAGE_", "PAGE_CACHE_", "TRACE_"))}
+                   | dict(kv.split("=", 1) for kv in args.env),
+        },
+        "levels": levels,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"loadtest_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved results to {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.compare} ({baseline.get('meta', {}).get('git_rev')}):")
+        for line in compare(result, baseline):
+            print("  " + line)
+    return result
+
+
+if __name__ == "__main__":
+    main()
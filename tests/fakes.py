@@ -0,0 +1,28 @@
+"""Test doubles shared by several test modules."""
+import asyncio
+
+
+class FakeHarvest:
+    """Stand-in client that returns `per_call` distinct profiles per request."""
+
+    def __init__(self, per_call=3, delay=0.0):
+        self.per_call = per_call
+        self.delay = delay
+        self.searches = []
+        self.geo_lookups = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def search_people(self, search="", title="", location="", geo_id="", page=1, limit=30):
+        self.searches.append((search, title, geo_id))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        tag = f"{search}|{title}|{geo_id}"
+        return [{"publicIdentifier": f"{tag}-{i}", "position": "Founder"} for i in range(self.per_call)]
+
+    async def lookup_geo_id(self, search):
+        self.geo_lookups.append(search)
+        await asyncio.sleep(self.delay)
+        return f"geo-{search.lower()}"
@@ -0,0 +1,116 @@
+import unittest
+import asyncio
+import json
+import multiprocessing
+import tempfile
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.app.services.batch import chunked, normalize_and_score, process_candidates
+from backend.app.services.ranking import TopK, top_k
+from backend.app.services.rules import DEFAULT_RULES_PATH, RuleEngine
+
+
+def _raw(n):
+    positions = ["CTO & Co-Founder", "Founder & CEO", "Head of Data", "Engineer", "Sales"]
+    return [
+        {"name": f"Person {i}", "publicIdentifier": f"p-{i}", "position": positions[i % len(positions)]}
+        for i in range(n)
+    ]
+
+
+class TestBatch(unittest.TestCase):
+
+    criteria = {"technical_signal": True, "sector": "data"}
+
+    def test_chunked(self):
+        """Test chunking keeps every item in order"""
+        chunks = list(chunked(list(range(7)), 3))
+
+        self.assertEqual(chunks, [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_inline_small_batch(self):
+        """Test small batches match the sequential pipeline"""
+        raw = _raw(5)
+
+        result = asyncio.run(process_candidates(raw, self.criteria, inline_max=10))
+
+        self.assertEqual(result, normalize_and_score(raw, self.criteria))
+
+    def test_thread_pool_preserves_order(self):
+        """Test chunked thread-pool results come back in input order"""
+        raw = _raw(53)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            result = asyncio.run(process_candidates(
+                raw, self.criteria, chunk_size=5, inline_max=0, executor=pool
+            ))
+
+        self.assertEqual(result, normalize_and_score(raw, self.criteria))
+
+    def test_process_pool_preserves_order(self):
+        """Test chunked process-pool results come back in input order"""
+        raw = _raw(40)
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            result = asyncio.run(process_candidates(
+                raw, self.criteria, chunk_size=7, inline_max=0, executor=pool
+            ))
+
+        self.assertEqual([p["name"] for p in result], [f"Person {i}" for i in range(40)])
+        self.assertEqual(result, normalize_and_score(raw, self.criteria))
+
+    def test_on_chunk_feeds_running_top_k(self):
+        """Test scored chunks are delivered as they finish"""
+        raw = _raw(53)
+        tracker = TopK(10)
+        chunks = []
+
+        def on_chunk(chunk):
+            chunks.append(len(chunk))
+            tracker.extend(chunk)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            result = asyncio.run(process_candidates(
+                raw, self.criteria, chunk_size=10, inline_max=0, executor=pool, on_chunk=on_chunk
+            ))
+
+        self.assertEqual(sorted(chunks), [3, 10, 10, 10, 10, 10])
+        self.assertEqual([c["name"] for c in tracker.items()], [c["name"] for c in top_k(result, 10)])
+
+    def test_workers_follow_forced_reload(self):
+        """Test pool workers pick up a reload forced in the parent, even with an unchanged mtime"""
+        raw = _raw(6)
+        with open(DEFAULT_RULES_PATH, encoding="utf-8") as f:
+            config = json.load(f)
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "rules.json")
+            with open(path, "w") as f:
+                json.dump(config, f)
+            engine = RuleEngine(path, check_interval=3600)
+
+            # fork: the worker starts with a copy of this engine (old rules)
+            with mock.patch("backend.app.services.rules._engine", engine), \
+                    ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as pool:
+                def run():
+                    return asyncio.run(process_candidates(raw, self.criteria, inline_max=0, executor=pool))
+
+                before = run()
+                stat = os.stat(path)
+                for rule in config["rules"]:
+                    rule["weight"] = rule.get("weight", 0) * 2
+                with open(path, "w") as f:
+                    json.dump(config, f)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                self.assertTrue(engine.reload(force=True))
+                after = run()
+                expected = normalize_and_score(raw, self.criteria)
+
+        self.assertNotEqual([p["score"] for p in before], [p["score"] for p in expected])
+        self.assertEqual(after, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.app.services.ranking import rank, rank_key
+from backend.app.storage.export import ExportFilter, export_candidates, external_sort, write_rows
+from backend.app.storage.repository import REQUIRED
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def _rows(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Person {rng.randrange(n)}",
+            "profile_type": rng.choice(["technical", "business"]),
+            "summary": rng.choice(["CTO at data startup", "Founder, fintech", "Sales lead"]),
+            "contacts": "", "source_links": "",
+            "match_justification": "Signals from position",
+            "tier": rng.choice(["A", "B", "C"]),
+            "score": rng.randrange(100),
+        }
+        for _ in range(n)
+    ]
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "candidates.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_csv(self, rows):
+        with open(self.path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=REQUIRED)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def test_external_sort_matches_in_memory_sort(self):
+        """Test spilled runs merge to the same stable order as sorted()"""
+        rows = _rows(1000)
+
+        spilled = list(external_sort(iter(rows), run_rows=64, tmp_dir=self.tmp.name))
+
+        self.assertEqual(spilled, rank(rows))
+
+    def test_external_sort_single_run_stays_in_memory(self):
+        """Test small inputs are sorted without spilling"""
+        rows = _rows(10)
+
+        self.assertEqual(list(external_sort(rows, run_rows=100)), sorted(rows, key=rank_key))
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_export_csv_filters_and_numbers(self):
+        """Test the CSV export applies dashboard filters to a ranked stream"""
+        self.write_csv(_rows(500))
+        filt = ExportFilter(tiers=["A", "B"], profile_types=["technical"], q="data")
+
+        body = b"".join(export_candidates(self.path, "csv", filt, numbered=True, run_rows=50))
+        out = list(csv.DictReader(io.StringIO(body.decode("utf-8"))))
+
+        self.assertTrue(out)
+        self.assertEqual([r["No."] for r in out], [str(i) for i in range(1, len(out) + 1)])
+        self.assertTrue(all(r["tier"] in ("A", "B") and r["profile_type"] == "technical" for r in out))
+        self.assertTrue(all("data" in r["summary"].lower() for r in out))
+        keys = [rank_key({**r, "score": int(r["score"])}) for r in out]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_export_jsonl(self):
+        """Test JSONL export has one ranked object per line"""
+        rows = _rows(30)
+        self.write_csv(rows)
+
+        lines = b"".join(export_candidates(self.path, "jsonl")).decode("utf-8").splitlines()
+        out = [json.loads(line) for line in lines]
+
+        self.assertEqual(len(out), 30)
+        self.assertEqual([r["name"] for r in out], [r["name"] for r in rank(rows)])
+        self.assertIsInstance(out[0]["score"], int)
+
+    def test_unknown_format(self):
+        """Test an unknown format fails before anything is written"""
+        with self.assertRaises(ValueError):
+            write_rows([], "xlsx")
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+    def test_export_parquet(self):
+        """Test Parquet export round-trips through pyarrow"""
+        import pyarrow.parquet as pq
+        rows = _rows(2500)
+        self.write_csv(rows)
+
+        body = b"".join(export_candidates(self.path, "parquet", run_rows=700))
+        table = pq.read_table(io.BytesIO(body))
+
+        self.assertEqual(table.num_rows, 2500)
+        self.assertEqual(table.column("name").to_pylist(), [r["name"] for r in rank(rows)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import json
+import timeit
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import httpx
+
+from backend.app.clients.json_stream import parse_elements, project_person
+
+
+def _profile(i):
+    return {
+        "name": f"Person {i}",
+        "publicIdentifier": f"person-{i}",
+        "position": "CTO, \"AI\" [stealth] {co}",
+        "linkedinUrl": f"https://www.linkedin.com/in/person-{i}",
+        "location": {"linkedinText": "Lisbon", "parsed": {"country": "PT"}},
+        "experience": [{"company": "X", "description": "lorem ipsum " * 40, "skills": ["a", "b"] * 20}] * 8,
+    }
+
+
+def _body(n):
+    return json.dumps({
+        "status": "ok",
+        "meta": {"elements": "not this one", "nested": [1, 2, {"x": "]"}]},
+        "elements": [_profile(i) for i in range(n)],
+        "pagination": {"totalPages": 10},
+    })
+
+
+class TestJsonStream(unittest.TestCase):
+
+    def test_project_person_keeps_pipeline_fields(self):
+        """Test projection drops nested profile data"""
+        result = project_person(_profile(1))
+
+        self.assertEqual(set(result), {"name", "publicIdentifier", "position", "linkedinUrl", "location"})
+        self.assertEqual(result["location"], {"linkedinText": "Lisbon"})
+
+    def test_parse_matches_full_json(self):
+        """Test parsed elements equal projected json.loads output, from str or bytes"""
+        body = _body(5)
+        expected = [project_person(p) for p in json.loads(body)["elements"]]
+
+        self.assertEqual(parse_elements(body, limit=30), expected)
+        self.assertEqual(parse_elements(body.encode("utf-8"), limit=30), expected)
+
+    def test_parse_respects_limit(self):
+        """Test parsing keeps at most limit elements"""
+        result = parse_elements(_body(10), limit=3)
+
+        self.assertEqual([p["publicIdentifier"] for p in result], ["person-0", "person-1", "person-2"])
+
+    def test_missing_or_empty_elements(self):
+        """Test bodies without results"""
+        self.assertEqual(parse_elements(json.dumps({"elements": []}), limit=30), [])
+        self.assertEqual(parse_elements(json.dumps({"error": "quota"}), limit=30), [])
+        self.assertEqual(parse_elements(json.dumps([1, 2]), limit=30), [])
+
+    def test_invalid_json(self):
+        """Test a broken body raises ValueError (the client reports it as a Harvest error)"""
+        with self.assertRaises(ValueError):
+            parse_elements('{"elements": [', limit=30)
+
+    def test_not_slower_than_response_json(self):
+        """Benchmark: parsing a full page costs no more than httpx's r.json()"""
+        body = _body(25).encode("utf-8")       # ~180 KB, a full Harvest page
+
+        def best(fn):
+            return min(timeit.repeat(fn, number=20, repeat=7))
+
+        baseline = best(lambda: httpx.Response(200, content=body).json())
+        ours = best(lambda: parse_elements(body, limit=30))
+
+        # same C decoder underneath; allow noise, but catch a pure-Python parser
+        self.assertLess(ours, baseline * 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
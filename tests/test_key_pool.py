@@ -0,0 +1,211 @@
+import unittest
+import asyncio
+import sys
+import os
+from unittest import mock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import httpx
+from fastapi.testclient import TestClient
+
+from backend.app.clients.harvest_client import HarvestClient
+from backend.app.clients.key_pool import KeyPool, KeyPoolExhausted, current_lane, harvest_lane, parse_weights
+from backend.app.main import app
+from backend.app.settings import Settings
+from harvest_simulator import SimConfig, build_app
+
+
+class TestKeyPool(unittest.TestCase):
+
+    def test_weighted_fair_share_between_lanes(self):
+        """Test backlogged lanes are served in proportion to their weights"""
+        async def run():
+            pool = KeyPool(["key-1"], max_in_flight=1, weights={"interactive": 4, "batch": 1})
+            order = []
+
+            async def call(lane):
+                async with pool.lease(lane):
+                    order.append(lane)
+                    await asyncio.sleep(0)
+
+            # batch queues first, yet interactive is not starved behind it
+            await asyncio.gather(*[call("batch") for _ in range(20)], *[call("interactive") for _ in range(20)])
+            return order
+
+        order = asyncio.run(run())
+
+        first = order[:15]
+        self.assertGreaterEqual(first.count("interactive"), 10)
+        self.assertGreaterEqual(first.count("batch"), 2)
+        self.assertEqual(len(order), 40)
+
+    def test_sub_lanes_share_class_weight(self):
+        """Test sending more X-User names does not buy a class a bigger share"""
+        async def run():
+            pool = KeyPool(["key-1"], max_in_flight=1, weights=parse_weights("interactive:1,batch:1"))
+            order = []
+
+            async def call(lane):
+                async with pool.lease(lane):
+                    order.append(lane.split(":")[0])
+                    await asyncio.sleep(0)
+
+            users = [call(f"interactive:user-{u}") for u in range(5) for _ in range(8)]
+            await asyncio.gather(*[call("batch") for _ in range(20)], *users)
+            return order
+
+        order = asyncio.run(run())
+
+        self.assertIn(order[:20].count("batch"), range(9, 12))
+        self.assertEqual(len(order), 60)
+
+    def test_busy_user_does_not_starve_others(self):
+        """Test users of one class are served round-robin"""
+        async def run():
+            pool = KeyPool(["key-1"], max_in_flight=1)
+            order = []
+
+            async def call(lane):
+                async with pool.lease(lane):
+                    order.append(lane)
+                    await asyncio.sleep(0)
+
+            await asyncio.gather(*[call("interactive:alice") for _ in range(20)],
+                                 *[call("interactive:bob") for _ in range(3)])
+            return order
+
+        order = asyncio.run(run())
+
+        self.assertLessEqual(max(i for i, lane in enumerate(order) if lane.endswith("bob")), 6)
+
+    def test_throttled_key_falls_back_to_next(self):
+        """Test a 429 cools a key down and the next lease gets another key"""
+        async def run():
+            pool = KeyPool(["key-1", "key-2"], max_in_flight=1, cooldown=60)
+            async with pool.lease() as first:
+                first.reject(429, "120")
+            async with pool.lease() as second:
+                return first.key, second.key, pool.describe()
+
+        first, second, state = asyncio.run(run())
+
+        self.assertNotEqual(first, second)
+        cooled = next(k for k in state["keys"] if k["key"] == f"...{first[-4:]}")
+        self.assertGreater(cooled["cooldown_seconds"], 100)
+        self.assertEqual(cooled["throttled"], 1)
+
+    def test_quota_exhaustion(self):
+        """Test requests fail fast once every key's quota is spent"""
+        async def run():
+            pool = KeyPool(["key-1"], quota=2, quota_window=3600, queue_timeout=1)
+            for _ in range(2):
+                async with pool.lease():
+                    pass
+            async with pool.lease():
+                pass
+
+        with self.assertRaises(KeyPoolExhausted):
+            asyncio.run(run())
+
+    def test_rejected_key_is_disabled_until_reset(self):
+        """Test a 401 takes the key out of rotation until reset() brings it back"""
+        async def run():
+            pool = KeyPool(["key-1", "key-2"])
+            async with pool.lease() as lease:
+                lease.reject(401)
+            keys = set()
+            for _ in range(5):
+                async with pool.lease() as l:
+                    keys.add(l.key)
+            disabled = [k["disabled"] for k in pool.describe()["keys"]]
+            reset = pool.reset(lease.key[-4:])
+            after = set()
+            for _ in range(4):
+                async with pool.lease() as l:
+                    after.add(l.key)
+            return lease.key, keys, disabled, reset, after
+
+        bad, keys, disabled, reset, after = asyncio.run(run())
+
+        self.assertNotIn(bad, keys)
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(disabled.count(True), 1)
+        self.assertEqual(reset, [f"...{bad[-4:]}"])
+        self.assertIn(bad, after)
+
+    def test_reset_endpoint(self):
+        """Test POST /harvest/keys/reset re-enables a key, and 404s on unknown keys"""
+        pool = KeyPool(["key-1", "key-2"])
+        pool.reject(pool.keys[0], 401)
+        client = TestClient(app)
+
+        with mock.patch("backend.app.main.get_key_pool", return_value=pool):
+            missing = client.post("/harvest/keys/reset?key=zzzz")
+            r = client.post("/harvest/keys/reset?key=ey-1")
+            state = client.get("/harvest/keys").json()
+
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(r.json(), {"reset": ["...ey-1"]})
+        self.assertFalse(any(k["disabled"] for k in state["keys"]))
+
+    def test_auth_rejection_expires(self):
+        """Test a 401 is a long cooldown, not a permanent disable"""
+        async def run():
+            pool = KeyPool(["key-1"], auth_cooldown=0.05, queue_timeout=1)
+            async with pool.lease() as lease:
+                lease.reject(403)
+            async with pool.lease() as again:
+                return lease.key, again.key, pool.describe()["keys"][0]
+
+        first, again, state = asyncio.run(run())
+
+        self.assertEqual(first, again)
+        self.assertFalse(state["disabled"])
+        self.assertEqual(state["auth_failures"], 1)
+
+    def test_single_key_joins_key_list(self):
+        """Test HARVEST_API_KEY is pooled with HARVEST_API_KEYS instead of ignored"""
+        env = {"HARVEST_API_KEY": "solo", "HARVEST_API_KEYS": "key-1, solo,key-2"}
+        with mock.patch.dict(os.environ, env):
+            settings = Settings.from_env()
+
+        self.assertEqual(settings.harvest_api_keys, ("solo", "key-1", "key-2"))
+        self.assertEqual(settings.harvest_api_key, "solo")
+
+    def test_lane_propagates_to_tasks(self):
+        """Test the lane set by a caller is seen by tasks it spawns"""
+        async def run():
+            with harvest_lane("scheduled"):
+                inner = await asyncio.create_task(asyncio.sleep(0, result=current_lane()))
+            return inner, current_lane()
+
+        self.assertEqual(asyncio.run(run()), ("scheduled", "interactive"))
+
+    def test_client_retries_on_other_keys(self):
+        """Test HarvestClient moves past invalid and over-quota keys on the simulator"""
+        async def run():
+            app = build_app(SimConfig(latency_ms=0, jitter_ms=0, keys=("good-1", "good-2"), key_quota=1))
+            pool = KeyPool(["bad-key", "good-1", "good-2"], max_in_flight=1)
+            client = HarvestClient(base_url="http://sim", pool=pool)
+            transport = httpx.ASGITransport(app=app)
+            statuses = []
+            async with httpx.AsyncClient(transport=transport, base_url="http://sim") as http:
+                for _ in range(2):
+                    async with client._get(http, "http://sim/linkedin/geo-id-search", {"search": "Lisbon"}) as r:
+                        statuses.append(r.status_code)
+                with self.assertRaises(KeyPoolExhausted):
+                    async with client._get(http, "http://sim/linkedin/geo-id-search", {"search": "Lisbon"}):
+                        pass
+                stats = (await http.get("/_sim/stats")).json()
+            return statuses, stats, pool.describe()
+
+        statuses, stats, state = asyncio.run(run())
+
+        self.assertEqual(statuses, [200, 200])
+        self.assertEqual({k: v["requests"] for k, v in stats["keys"].items()}, {"od-1": 1, "od-2": 1})
+        self.assertTrue(next(k for k in state["keys"] if k["key"] == "...-key")["disabled"])
+
+
+if __name__ == '__main__':
+    unittest.main()
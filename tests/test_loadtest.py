@@ -0,0 +1,90 @@
+import unittest
+import asyncio
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import httpx
+from fastapi.testclient import TestClient
+
+import loadtest
+from harvest_simulator import SimConfig, build_app
+
+
+class TestLoadTest(unittest.TestCase):
+
+    def test_percentile(self):
+        """Test interpolated percentiles"""
+        values = list(range(1, 101))
+
+        self.assertEqual(loadtest.percentile(values, 50), 50.5)
+        self.assertAlmostEqual(loadtest.percentile(values, 99), 99.01)
+        self.assertEqual(loadtest.percentile([], 95), 0.0)
+
+    def test_parse_mix(self):
+        """Test request mix parsing rejects unknown request types"""
+        self.assertEqual(loadtest.parse_mix("search=3,health"), {"search": 3.0, "health": 1.0})
+        with self.assertRaises(ValueError):
+            loadtest.parse_mix("search=1,nope=2")
+
+    def test_compare(self):
+        """Test comparison lines match levels by concurrency"""
+        def level(c, rps, p95):
+            return {"concurrency": c, "rps": rps, "latency_ms": {"p95": p95, "p99": p95}}
+        old = {"levels": [level(1, 10.0, 100.0), level(8, 20.0, 400.0)]}
+        new = {"levels": [level(8, 30.0, 200.0), level(64, 5.0, 900.0)]}
+
+        lines = loadtest.compare(new, old)
+
+        self.assertEqual(len(lines), 1)
+        self.assertIn("+50.0%", lines[0])
+        self.assertIn("-50.0%", lines[0])
+
+    def test_run_level_against_app(self):
+        """Test a closed-loop level records latencies per request type"""
+        async def run():
+            app = build_app(SimConfig(latency_ms=0, jitter_ms=0))
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://sim") as client:
+                loadtest.OPS["sim"] = lambda s: s.client.get("/_sim/stats")
+                try:
+                    return await loadtest.run_level(loadtest.Session(client), {"sim": 1}, 4, 0.2, 0.0)
+                finally:
+                    del loadtest.OPS["sim"]
+
+        level = asyncio.run(run())
+
+        self.assertGreater(level["requests"], 0)
+        self.assertEqual(level["error_rate"], 0.0)
+        self.assertEqual(level["ops"]["sim"]["count"], level["requests"])
+
+
+class TestHarvestSimulator(unittest.TestCase):
+
+    def test_pages_are_deterministic(self):
+        """Test the same query returns the same page and sizes follow the config"""
+        client = TestClient(build_app(SimConfig(latency_ms=0, jitter_ms=0, results=7)))
+        params = {"title": "Founder", "page": "1"}
+
+        first = client.get("/linkedin/profile-search", params=params).json()["elements"]
+        second = client.get("/linkedin/profile-search", params=params).json()["elements"]
+        other = client.get("/linkedin/profile-search", params={**params, "page": "2"}).json()["elements"]
+
+        self.assertEqual(len(first), 7)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertTrue(client.get("/linkedin/geo-id-search", params={"search": "Lisbon"}).json()["elements"])
+
+    def test_error_rate(self):
+        """Test simulated failures use the configured status"""
+        client = TestClient(build_app(SimConfig(latency_ms=0, jitter_ms=0, error_rate=1.0, error_status=429)))
+
+        r = client.get("/linkedin/profile-search")
+
+        self.assertEqual(r.status_code, 429)
+        self.assertEqual(client.get("/_sim/stats").json(), {"requests": 1, "errors": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
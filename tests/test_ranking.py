@@ -0,0 +1,71 @@
+import unittest
+import random
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.app.services.ranking import TopK, merge_ranked, rank, rank_key, top_k
+
+
+def _candidates(n, seed=7):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        score = rnd.randint(0, 100)
+        tier = "A" if score >= 80 else "B" if score >= 60 else "C"
+        out.append({"name": f"n{rnd.randint(0, 30):02d}", "score": score, "tier": tier, "i": i})
+    return out
+
+
+class TestRanking(unittest.TestCase):
+
+    def test_rank_key_order(self):
+        """Test Tier → Score (desc) → Name ordering"""
+        items = [
+            {"name": "b", "tier": "B", "score": 70},
+            {"name": "a", "tier": "A", "score": 85},
+            {"name": "a", "tier": "B", "score": 70},
+            {"name": "z", "tier": "B", "score": 75},
+            {"name": "x", "tier": "", "score": ""},
+        ]
+
+        self.assertEqual([(c["tier"], c["name"]) for c in rank(items)],
+                         [("A", "a"), ("B", "z"), ("B", "a"), ("B", "b"), ("", "x")])
+
+    def test_top_k_matches_full_sort(self):
+        """Test top-K equals the head of a full stable sort"""
+        items = _candidates(500)
+        expected = sorted(items, key=rank_key)[:25]
+
+        self.assertEqual(top_k(items, 25), expected)
+
+        tracker = TopK(25)
+        for chunk_start in range(0, 500, 37):
+            tracker.extend(items[chunk_start:chunk_start + 37])
+        self.assertEqual(tracker.items(), expected)
+        self.assertEqual(tracker.seen, 500)
+
+    def test_top_k_available_while_streaming(self):
+        """Test the running top-K is correct after every push"""
+        items = _candidates(60)
+        tracker = TopK(5)
+        for n, item in enumerate(items, 1):
+            tracker.push(item)
+            self.assertEqual(tracker.items(), sorted(items[:n], key=rank_key)[:5])
+
+    def test_merge_ranked_runs(self):
+        """Test k-way merge of ranked runs, keeping the best row per identity"""
+        runs = [rank(_candidates(50, seed=s)) for s in (1, 2, 3)]
+
+        merged = list(merge_ranked(*runs))
+        self.assertEqual(merged, sorted([c for r in runs for c in r], key=rank_key))
+
+        unique = list(merge_ranked(*runs, unique_by=lambda c: c["name"]))
+        self.assertEqual(len(unique), len({c["name"] for r in runs for c in r}))
+        for c in unique:
+            best = min((x for r in runs for x in r if x["name"] == c["name"]), key=rank_key)
+            self.assertEqual(rank_key(c), rank_key(best))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import unittest
+import asyncio
+import tempfile
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.app.services.refresh import RefreshScheduler, diff_snapshot, fingerprint, run_saved_search
+from backend.app.services.search import PageCache
+from backend.app.storage.saved_searches import SavedSearchStore
+
+
+def _entry(name, summary="Founder"):
+    c = {"name": name, "summary": summary, "tier": "C", "score": 25}
+    return {"key": ["id", name], "fp": fingerprint(c), "candidate": c}
+
+
+class FakeHarvest:
+    """Returns the same `people` for every request."""
+
+    def __init__(self, people):
+        self.people = people
+        self.calls = 0
+
+    async def search_people(self, **kwargs):
+        self.calls += 1
+        return [{"publicIdentifier": p, "name": p, "position": "CTO & Founder"} for p in self.people]
+
+    async def lookup_geo_id(self, search):
+        return ""
+
+
+class PagedHarvest(FakeHarvest):
+    """Returns `pages[search]` (default: `people`) for each request."""
+
+    def __init__(self, people, pages):
+        super().__init__(people)
+        self.pages = pages
+
+    async def search_people(self, **kwargs):
+        self.calls += 1
+        people = self.pages.get(kwargs.get("search", ""), self.people)
+        return [{"publicIdentifier": p, "name": p, "position": "CTO & Founder"} for p in people]
+
+
+class TestRefresh(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        d = self.tmp.name
+        self.store = SavedSearchStore(
+            path=os.path.join(d, "saved.json"),
+            snapshot_dir=os.path.join(d, "snapshots"),
+            delta_dir=os.path.join(d, "deltas"),
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_diff_new_changed_removed(self):
+        """Test a complete run reports new, changed and removed candidates"""
+        previous = {"a": _entry("a"), "b": _entry("b"), "c": _entry("c")}
+        current = {"a": _entry("a"), "b": _entry("b", "CTO"), "d": _entry("d")}
+
+        events, snapshot = diff_snapshot(previous, current, complete=True)
+
+        changes = sorted((e["change"], e["key"]) for e in events)
+        self.assertEqual(changes, [("changed", "b"), ("new", "d"), ("removed", "c")])
+        self.assertEqual(set(snapshot), {"a", "b", "d"})
+
+    def test_diff_incomplete_run_keeps_unseen(self):
+        """Test an early-stopped run does not report unseen candidates as removed"""
+        previous = {"a": _entry("a"), "c": _entry("c")}
+        current = {"a": _entry("a")}
+
+        events, snapshot = diff_snapshot(previous, current, complete=False)
+
+        self.assertEqual(events, [])
+        self.assertEqual(set(snapshot), {"a", "c"})
+
+    def test_diff_incomplete_run_removes_from_fetched_pages(self):
+        """Test an early-stopped run reports removals only for pages it fetched again"""
+        previous = {"a": dict(_entry("a"), sources=["p1"]), "b": dict(_entry("b"), sources=["p1", "p2"]),
+                    "c": dict(_entry("c"), sources=["p2"]), "d": _entry("d")}
+        current = {}
+
+        events, snapshot = diff_snapshot(previous, current, complete=False, fetched=["p1"])
+
+        self.assertEqual([(e["change"], e["key"]) for e in events], [("removed", "a")])
+        self.assertEqual(set(snapshot), {"b", "c", "d"})
+
+    def test_incremental_runs_emit_deltas(self):
+        """Test repeated runs only emit what changed, and stop early on known pages"""
+        saved = self.store.create("ai", {"sector": None}, 60)
+
+        first = asyncio.run(run_saved_search(self.store, saved, FakeHarvest(["p1", "p2"])))
+        self.assertEqual(first["new"], 2)
+        self.assertGreater(first["api_calls"], 1)
+
+        harvest = FakeHarvest(["p1", "p2"])
+        second = asyncio.run(run_saved_search(self.store, self.store.get(saved["id"]), harvest))
+        self.assertTrue(second["stopped_early"])
+        self.assertEqual(harvest.calls, 1)
+        self.assertEqual((second["new"], second["changed"], second["removed"]), (0, 0, 0))
+
+        third = asyncio.run(run_saved_search(self.store, self.store.get(saved["id"]), FakeHarvest(["p3"])))
+        self.assertEqual(third["new"], 1)
+        self.assertEqual(third["removed"], 2)
+
+        feed = list(self.store.iter_deltas(saved["id"]))
+        self.assertEqual([e["seq"] for e in feed], [1, 2, 3, 4, 5])
+        self.assertEqual([e["change"] for e in self.store.iter_deltas(saved["id"], since=2)],
+                         ["new", "removed", "removed"])
+
+    def test_steady_state_runs_report_removals(self):
+        """Test early-stopped runs still report who left the first page"""
+        saved = self.store.create("ai", {"sector": None}, 60)
+        rest = {"founder": ["r1"], "founder fintech": ["r1"]}
+        asyncio.run(run_saved_search(self.store, saved, PagedHarvest(["r1"], dict(rest, **{"": ["a", "b"]}))))
+
+        harvest = PagedHarvest(["r1"], dict(rest, **{"": ["a"]}))
+        second = asyncio.run(run_saved_search(self.store, self.store.get(saved["id"]), harvest))
+
+        self.assertTrue(second["stopped_early"])
+        self.assertEqual(harvest.calls, 1)
+        self.assertEqual(second["removed"], 1)
+        self.assertEqual([e["key"] for e in self.store.iter_deltas(saved["id"]) if e["change"] == "removed"],
+                         ["id|b"])
+        self.assertEqual(len(self.store.load_snapshot(saved["id"])), 2)
+
+    def test_full_run_every_n(self):
+        """Test every n-th run ignores the snapshot and fetches every page"""
+        saved = self.store.create("ai", {"sector": None}, 60)
+        summaries = []
+        for _ in range(3):
+            saved = self.store.get(saved["id"])
+            summaries.append(asyncio.run(run_saved_search(self.store, saved, FakeHarvest(["p1"]), full_every=2)))
+
+        self.assertEqual([s["full_run"] for s in summaries], [True, False, True])
+        self.assertEqual([s["stopped_early"] for s in summaries], [False, True, False])
+        self.assertEqual(self.store.get(saved["id"])["runs"], 3)
+
+    def test_page_cache_max_age(self):
+        """Test callers can refuse cached pages older than they tolerate"""
+        cache = PageCache(ttl=60)
+        cache.put(("k",), ["page"])
+
+        self.assertEqual(cache.get(("k",), max_age=30), ["page"])
+        self.assertIsNone(cache.get(("k",), max_age=0))
+        self.assertEqual(cache.get(("k",)), ["page"])
+
+    def test_page_cache_shared_across_runs(self):
+        """Test cached pages are reused by later runs"""
+        cache = PageCache(ttl=60)
+        a = self.store.create("a", {}, 60)
+        b = self.store.create("b", {}, 60)
+        harvest = FakeHarvest(["p1"])
+
+        asyncio.run(run_saved_search(self.store, a, harvest, cache))
+        calls = harvest.calls
+        summary = asyncio.run(run_saved_search(self.store, b, harvest, cache))
+
+        self.assertEqual(harvest.calls, calls)
+        self.assertEqual(summary["api_calls"], 0)
+        self.assertEqual(summary["new"], 1)
+
+    def test_store_due_and_delete(self):
+        """Test new saved searches are due immediately and can be deleted"""
+        saved = self.store.create("x", {}, 60)
+
+        self.assertEqual([s["id"] for s in self.store.due()], [saved["id"]])
+        self.assertTrue(self.store.delete(saved["id"]))
+        self.assertIsNone(self.store.get(saved["id"]))
+        self.assertFalse(self.store.delete(saved["id"]))
+
+    def test_delete_during_run(self):
+        """Test a search deleted mid-run is dropped quietly and leaves no files behind"""
+        saved = self.store.create("x", {}, 60)
+        asyncio.run(run_saved_search(self.store, saved, FakeHarvest(["p1"])))
+        store = self.store
+
+        class DeletingHarvest(FakeHarvest):
+            async def search_people(self, **kwargs):
+                store.delete(saved["id"])
+                return await super().search_people(**kwargs)
+
+        scheduler = RefreshScheduler(self.store, lambda: DeletingHarvest(["p2"]))
+        summary = asyncio.run(scheduler.run(saved["id"]))
+
+        self.assertIsNone(summary)
+        self.assertIsNone(self.store.get(saved["id"]))
+        self.assertFalse(os.path.exists(self.store._snapshot_path(saved["id"])))
+        self.assertFalse(os.path.exists(self.store._delta_path(saved["id"])))
+
+    def test_scheduler_survives_failing_tick(self):
+        """Test the scheduler loop logs a failed tick and keeps running"""
+        calls = []
+
+        def broken_due():
+            calls.append(1)
+            raise ValueError("corrupt saved_searches.json")
+
+        self.store.due = broken_due
+        scheduler = RefreshScheduler(self.store, lambda: FakeHarvest([]), tick=0.01)
+
+        async def run():
+            scheduler.start()
+            await asyncio.sleep(0.1)
+            alive = not scheduler._task.done()
+            await scheduler.stop()
+            return alive
+
+        with self.assertLogs("backend.app.services.refresh", level="ERROR"):
+            self.assertTrue(asyncio.run(run()))
+        self.assertGreater(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
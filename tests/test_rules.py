@@ -0,0 +1,147 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.app.models import Criteria
+from backend.app.services.rules import DEFAULT_RULES_PATH, RuleEngine, compile_rules, load_rules
+
+
+def _config(**overrides):
+    with open(DEFAULT_RULES_PATH, encoding="utf-8") as f:
+        config = json.load(f)
+    config.update(overrides)
+    return config
+
+
+class TestRules(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = load_rules(DEFAULT_RULES_PATH)
+
+    def test_score_matches_explain(self):
+        """Test the generated scorer agrees with the rule-by-rule explanation"""
+        texts = [
+            "CTO & Co-Founder at AI startup",
+            "Director of Sales",          # "director" contains "cto"
+            "Head of Engineering, PhD, 10+ years",
+            "Professional",
+            "",
+        ]
+        criteria_list = [
+            {},
+            {"technical_signal": False, "sector": "ai"},
+            {"academic": "PhD or MSc", "min_years_experience": 5, "startup_experience_required": True},
+        ]
+        for text in texts:
+            for criteria in criteria_list:
+                score, tier, _ = self.rules.explain(text, criteria)
+                self.assertEqual(self.rules.score(text, criteria), (score, tier), (text, criteria))
+
+    def test_default_scores_match_baseline(self):
+        """Test default rules and default Criteria reproduce the original hard-coded scores"""
+        def baseline(text, criteria):
+            tl = text.lower()
+            score = 0
+            if any(k in tl for k in ["founder", "co-founder", "exit"]): score += 25
+            if any(k in tl for k in ["cto", "engineer", "developer", "ml", "ai", "data", "research"]):
+                score += 25 if criteria.get("technical_signal", True) else 10
+            if any(k in tl for k in ["phd", "msc", "master"]): score += 10
+            sector = (criteria.get("sector") or "").lower()
+            if sector and sector in tl: score += 15
+            if any(k in tl for k in ["head of", "director", "vp", "c-level", "chief", "lead"]): score += 15
+            score = max(0, min(100, score))
+            return score, "A" if score >= 80 else "B" if score >= 60 else "C"
+
+        texts = [
+            "CTO & Co-Founder at AI startup · 12 years",
+            "Founder, stealth venture-backed startup, 8+ years in fintech",
+            "Head of Data, PhD, 10 years experience",
+            "Sales lead",
+            "",
+        ]
+        for criteria in (Criteria().model_dump(), Criteria(technical_signal=False, sector="fintech").model_dump()):
+            for text in texts:
+                self.assertEqual(self.rules.score(text, criteria), baseline(text, criteria), (text, criteria))
+
+    def test_explain_lists_fired_rules(self):
+        """Test explanation reports each fired rule and its weight"""
+        config = _config()
+        for rule in config["rules"]:
+            if rule["id"] in ("startup", "experience"):
+                rule["weight"] = 10      # opt in
+        score, tier, fired = compile_rules(config).explain(
+            "Founder at a stealth startup with 7 years in ML and an MSc",
+            {"technical_signal": False, "academic": "PhD or MSc",
+             "min_years_experience": 5, "startup_experience_required": True},
+        )
+
+        self.assertEqual(
+            [(f["rule"], f["weight"]) for f in fired],
+            [("founder", 25), ("technical", 10), ("education", 10),
+             ("startup", 10), ("academic", 5), ("experience", 10)],
+        )
+        self.assertEqual(score, 70)
+        self.assertEqual(tier, "B")
+
+    def test_unused_criteria_rules_need_criteria(self):
+        """Test criteria-driven rules stay off when the criteria are not set"""
+        text = "Startup founder, 12 years, PhD"
+        config = _config()
+        for rule in config["rules"]:
+            rule["weight"] = rule["weight"] or 10
+
+        _, _, fired = compile_rules(config).explain(text, {"min_years_experience": 20})
+
+        self.assertNotIn("startup", [f["rule"] for f in fired])
+        self.assertNotIn("experience", [f["rule"] for f in fired])
+
+    def test_profile_type(self):
+        """Test profile type keywords come from the config"""
+        rules = compile_rules(_config(profile_type={"keywords": ["designer"], "match": "technical", "default": "business"}))
+
+        self.assertEqual(rules.profile_type("Product Designer"), "technical")
+        self.assertEqual(rules.profile_type("CTO"), "business")
+
+    def test_invalid_configs(self):
+        """Test config validation errors"""
+        with self.assertRaises(ValueError):
+            compile_rules({"rules": []})
+        with self.assertRaises(ValueError):
+            compile_rules({"version": 1, "rules": [{"id": "x", "type": "nope"}]})
+        with self.assertRaises(ValueError):
+            compile_rules({"version": 1, "rules": [{"id": "x", "weight": 5}]})
+        with self.assertRaises(ValueError):
+            compile_rules({"version": 1, "rules": [
+                {"id": "x", "keywords": ["a"]}, {"id": "x", "keywords": ["b"]}
+            ]})
+
+    def test_hot_reload(self):
+        """Test the engine picks up edits and keeps the last good rules on bad edits"""
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "rules.json")
+            with open(path, "w") as f:
+                json.dump(_config(), f)
+            engine = RuleEngine(path, check_interval=0)
+            self.assertEqual(engine.current().score("founder", {}), (25, "C"))
+
+            config = _config(version=2)
+            config["rules"][0]["weight"] = 90
+            with open(path, "w") as f:
+                json.dump(config, f)
+            os.utime(path, (1, 1))
+
+            self.assertEqual(engine.current().version, 2)
+            self.assertEqual(engine.current().score("founder", {}), (90, "A"))
+
+            with open(path, "w") as f:
+                f.write("{not json")
+            os.utime(path, (2, 2))
+
+            self.assertEqual(engine.current().version, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
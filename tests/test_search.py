@@ -0,0 +1,107 @@
+import unittest
+import asyncio
+import sys
+import os
+from unittest import mock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.app.models import Criteria
+from backend.app.services.search import (
+    ROTATION_QUERIES, TARGET_RESULTS, HarvestFetcher, build_title, collect_candidates
+)
+from backend.app.main import app
+from backend.app.storage.writer import CsvWriter
+from fastapi.testclient import TestClient
+from tests.fakes import FakeHarvest
+
+
+class TestSearch(unittest.TestCase):
+
+    def test_build_title(self):
+        """Test title keywords follow the criteria signals"""
+        self.assertEqual(build_title(Criteria(technical_signal=False)), "Co-founder, Founder")
+        self.assertEqual(build_title(Criteria(founder_signal=False, technical_signal=False)), "")
+
+    def test_collect_stops_at_target(self):
+        """Test collection stops once TARGET_RESULTS unique candidates are found"""
+        fake = FakeHarvest(per_call=TARGET_RESULTS)
+
+        found = asyncio.run(collect_candidates(HarvestFetcher(fake), Criteria(sector="Lisbon")))
+
+        self.assertEqual(len(found["raw"]), TARGET_RESULTS)
+        self.assertEqual(found["geo_id"], "geo-lisbon")
+        self.assertEqual(found["attempt_used"], "geoId")
+        self.assertEqual(len(fake.searches), 1)
+
+    def test_collect_runs_rotations_once(self):
+        """Test a single search never repeats an identical Harvest request"""
+        fake = FakeHarvest(per_call=1)
+        fetcher = HarvestFetcher(fake)
+
+        asyncio.run(collect_candidates(fetcher, Criteria()))
+
+        self.assertEqual(len(fake.searches), len(set(fake.searches)))
+        # Without a sector the geoId attempt equals the global attempt, and
+        # "founder fintech" is both an initial attempt and a rotation query
+        self.assertEqual(fetcher.api_calls, 4 + len(ROTATION_QUERIES) - 2)
+
+    def test_batch_shares_requests(self):
+        """Test criteria in one batch share geo lookups and queries"""
+        fake = FakeHarvest(per_call=1, delay=0.01)
+        fetcher = HarvestFetcher(fake, max_concurrency=2)
+        batch = [
+            Criteria(sector="Lisbon"),
+            Criteria(sector="lisbon", technical_signal=False),
+            Criteria(sector="Berlin"),
+            Criteria(),
+        ]
+
+        async def run():
+            return await asyncio.gather(*(collect_candidates(fetcher, c) for c in batch))
+
+        found = asyncio.run(run())
+
+        self.assertEqual(sorted(fake.geo_lookups), ["Berlin", "Lisbon"])
+        self.assertEqual(len(fake.searches), len(set(fake.searches)))
+        self.assertLessEqual(fake.max_in_flight, 2)
+        # Same answers as running each criteria on its own
+        for c, f in zip(batch, found):
+            alone = asyncio.run(collect_candidates(HarvestFetcher(FakeHarvest(per_call=1)), c))
+            self.assertEqual(f["raw"], alone["raw"])
+
+
+
+class TestBatchEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeHarvest(per_call=2)
+        self.writes = []
+        app.state.writer = CsvWriter(write_fn=lambda items: self.writes.append(items) or "candidates.csv")
+        patcher = mock.patch("backend.app.main.HarvestClient", return_value=self.fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(delattr, app.state, "writer")
+
+    def test_search_batch(self):
+        """Test /search/batch shares Harvest calls, answers per criteria and queues one write"""
+        body = {"criteria": [{"sector": "Lisbon"}, {"sector": "lisbon"}, {"sector": "Berlin"}], "top_n": 5}
+
+        # no lifespan: the writer is ours, and durable=true finishes the write in-request
+        r = TestClient(app).post("/search/batch?durable=true", json=body)
+
+        self.assertEqual(r.status_code, 200)
+        data = r.json()
+        self.assertEqual(sorted(self.fake.geo_lookups), ["Berlin", "Lisbon"])
+        self.assertEqual(len(self.fake.searches), len(set(self.fake.searches)))
+        self.assertEqual(data["api_calls"], len(self.fake.searches) + len(self.fake.geo_lookups))
+        self.assertEqual([res["index"] for res in data["results"]], [0, 1, 2])
+        self.assertEqual(data["results"][0]["items"], data["results"][1]["items"])
+        self.assertEqual([res["geo_id_used"] for res in data["results"]], ["geo-lisbon", "geo-lisbon", "geo-berlin"])
+        self.assertTrue(all(len(res["items"]) == 5 for res in data["results"]))
+        self.assertEqual(data["write_status"], "done")
+        self.assertEqual(len(self.writes), 1)
+        self.assertEqual(len(self.writes[0]), data["pool_size"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import subprocess
+import sys
+import os
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules that must stay off the import path of the app (loaded on first use)
+HEAVY_MODULES = ("pandas", "numpy", "httpx", "dotenv", "concurrent.futures.process")
+
+# Import-time budgets in milliseconds (override for slow CI machines)
+APP_MODULES_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_APP_MS", "150"))
+TOTAL_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_TOTAL_MS", "1500"))
+
+
+def _import_times(module):
+    """Run `python -X importtime -c 'import module'` and parse {name: (self_us, cumulative_us)}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+class TestStartup(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.times = _import_times("backend.app.main")
+
+    def test_heavy_modules_are_lazy(self):
+        """Test pandas/httpx/dotenv are not imported with the app"""
+        loaded = [m for m in HEAVY_MODULES if m in self.times]
+
+        self.assertEqual(loaded, [])
+
+    def test_app_import_budget(self):
+        """Test the app's own modules and the full import stay within budget"""
+        own_ms = sum(s for name, (s, _) in self.times.items() if name.startswith("backend")) / 1000
+        total_ms = self.times["backend.app.main"][1] / 1000
+
+        self.assertLess(own_ms, APP_MODULES_BUDGET_MS)
+        self.assertLess(total_ms, TOTAL_BUDGET_MS)
+
+    def test_no_import_side_effects(self):
+        """Test importing the app does not read config or touch the data dir"""
+        code = (
+            "import os, sys\n"
+            "before = set(os.listdir('data'))\n"
+            "import backend.app.main\n"
+            "from backend.app.settings import get_settings\n"
+            "assert get_settings.cache_info().currsize == 0, 'settings resolved at import'\n"
+            "assert set(os.listdir('data')) == before, 'data dir touched at import'\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
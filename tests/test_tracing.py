@@ -0,0 +1,199 @@
+import unittest
+import asyncio
+import json
+import logging
+import sys
+import os
+import tempfile
+import time
+from unittest import mock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.app import tracing
+from backend.app.models import Criteria
+from backend.app.services.search import HarvestFetcher, PageCache, collect_candidates
+from backend.app.tracing import (
+    FileSpanExporter, JsonFormatter, LogSampler, SpanExporter, span, to_otlp
+)
+from backend.app.main import app
+from backend.app.settings import Settings
+from fastapi.testclient import TestClient
+from tests.fakes import FakeHarvest
+
+
+class MemoryExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+        super().__init__(flush_seconds=0.05)
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+def _record(level=logging.INFO, msg="hello", **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, (), None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = MemoryExporter()
+        tracing.set_exporter(self.exporter)
+
+    def tearDown(self):
+        tracing.set_exporter(None)
+
+    def finished(self):
+        tracing.set_exporter(None)   # flushes
+        return {s.name: s for s in self.exporter.spans}
+
+    def test_spans_nest_and_export(self):
+        """Test child spans share the trace and point at their parent"""
+        with span("root", route="/search") as root:
+            with span("child") as child:
+                child.set(result_count=3)
+
+        spans = self.finished()
+        self.assertEqual(spans["child"].trace_id, root.trace_id)
+        self.assertEqual(spans["child"].parent_id, root.span_id)
+        self.assertIsNone(spans["root"].parent_id)
+        self.assertEqual(spans["child"].attributes["result_count"], 3)
+
+    def test_error_recorded(self):
+        """Test an exception marks the span as failed and still exports it"""
+        with self.assertRaises(RuntimeError):
+            with span("boom"):
+                raise RuntimeError("nope")
+
+        self.assertIn("nope", self.finished()["boom"].error)
+
+    def test_unsampled_trace_not_exported(self):
+        """Test sampling drops whole traces"""
+        tracing.set_exporter(self.exporter, sample_rate=0.0)
+        with span("root"):
+            with span("child"):
+                pass
+
+        self.assertEqual(self.finished(), {})
+
+    def test_otlp_json_shape(self):
+        """Test spans encode as an OTLP/JSON export request"""
+        with span("root", page=2, cache="hit", ratio=0.5, ok=True):
+            pass
+        body = to_otlp(list(self.finished().values()))
+
+        otlp_span = body["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        attrs = {a["key"]: a["value"] for a in otlp_span["attributes"]}
+        self.assertEqual(len(otlp_span["traceId"]), 32)
+        self.assertEqual(len(otlp_span["spanId"]), 16)
+        self.assertEqual(attrs["page"], {"intValue": "2"})
+        self.assertEqual(attrs["cache"], {"stringValue": "hit"})
+        self.assertEqual(attrs["ratio"], {"doubleValue": 0.5})
+        self.assertEqual(attrs["ok"], {"boolValue": True})
+        self.assertEqual(otlp_span["status"], {"code": 1})
+
+    def test_file_exporter_writes_jsonl(self):
+        """Test the file exporter appends one OTLP request per batch"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces.jsonl")
+            tracing.set_exporter(FileSpanExporter(path))
+            with span("root"):
+                pass
+            tracing.set_exporter(None)
+
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"], "root")
+
+    def test_trace_file_defaults_to_data_dir(self):
+        """Test TRACE_EXPORT=file without TRACE_FILE writes into DATA_DIR"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch("backend.app.storage.repository.data_dir", return_value=tmp), \
+                mock.patch("backend.app.tracing.configure_logging"):
+            tracing.configure(Settings(trace_export="file"))
+            path = tracing._state.exporter.path
+
+        self.assertEqual(path, os.path.join(tmp, "traces.jsonl"))
+
+    def test_request_span_covers_streamed_body(self):
+        """Test the root request span ends after a streamed body, and records errors raised mid-stream"""
+        def slow_export(*args, **kwargs):
+            for _ in range(3):
+                time.sleep(0.03)
+                yield b"row\n"
+
+        def broken_export(*args, **kwargs):
+            yield b"row\n"
+            raise OSError("disk gone")
+
+        client = TestClient(app, raise_server_exceptions=False)
+        with tempfile.NamedTemporaryFile(suffix=".csv") as f, \
+                mock.patch("backend.app.main.csv_path", return_value=f.name):
+            with mock.patch("backend.app.main.export_candidates", slow_export):
+                r = client.get("/candidates/export")
+            self.assertEqual(r.content, b"row\n" * 3)
+            root = self.finished()["GET /candidates/export"]
+
+            self.assertEqual(root.trace_id, r.headers["X-Trace-Id"])
+            self.assertGreaterEqual(root.duration_ms, 80)
+            self.assertEqual(root.attributes["http.response_bytes"], 12)
+            self.assertIsNone(root.error)
+
+            self.exporter = MemoryExporter()
+            tracing.set_exporter(self.exporter)
+            with mock.patch("backend.app.main.export_candidates", broken_export):
+                client.get("/candidates/export")
+            root = self.finished()["GET /candidates/export"]
+
+        self.assertIn("disk gone", root.error)
+
+    def test_fetcher_records_cache_hits(self):
+        """Test Harvest page spans carry cache hit / miss / shared"""
+        cache = PageCache(ttl=60)
+
+        async def run():
+            with span("request"):
+                await collect_candidates(HarvestFetcher(FakeHarvest(per_call=1), cache=cache), Criteria())
+            with span("request"):
+                await collect_candidates(HarvestFetcher(FakeHarvest(per_call=1), cache=cache), Criteria())
+
+        asyncio.run(run())
+        tracing.set_exporter(None)
+        pages = [s for s in self.exporter.spans if s.name == "harvest.page"]
+        caches = [s.attributes.get("cache") for s in pages]
+
+        self.assertIn("miss", caches)
+        self.assertIn("hit", caches)
+        self.assertIn("shared", caches)
+        self.assertTrue(all("result_count" in s.attributes for s in pages))
+        self.assertTrue(any(s.name == "pipeline.dedupe" for s in self.exporter.spans))
+
+
+class TestStructuredLogs(unittest.TestCase):
+
+    def test_json_formatter_includes_extra_and_trace(self):
+        """Test JSON logs carry extra= fields and the active trace id"""
+        with span("root") as root:
+            line = JsonFormatter().format(_record(params={"page": "1"}, status=200))
+        out = json.loads(line)
+
+        self.assertEqual(out["msg"], "hello")
+        self.assertEqual(out["params"], {"page": "1"})
+        self.assertEqual(out["status"], 200)
+        self.assertEqual(out["trace_id"], root.trace_id)
+
+    def test_sampler_keeps_warnings(self):
+        """Test sampling drops INFO but never WARNING+"""
+        sampler = LogSampler(0.0)
+
+        self.assertFalse(sampler.filter(_record(logging.INFO)))
+        self.assertTrue(sampler.filter(_record(logging.WARNING)))
+        self.assertTrue(LogSampler(1.0).filter(_record(logging.DEBUG)))
+
+
+if __name__ == '__main__':
+    unittest.main()
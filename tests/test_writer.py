@@ -0,0 +1,141 @@
+import unittest
+import asyncio
+import threading
+import tempfile
+import sys
+import os
+from unittest import mock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.app.storage.repository import save_candidates_csv
+from backend.app.storage.writer import CsvWriter
+
+
+class TestWriter(unittest.IsolatedAsyncioTestCase):
+
+    async def test_submit_returns_before_write(self):
+        """Test submit does not wait for the disk write"""
+        gate = threading.Event()
+        written = []
+
+        def slow_write(items):
+            gate.wait(5)
+            written.append(items)
+            return "/tmp/candidates.csv"
+
+        writer = CsvWriter(write_fn=slow_write)
+        job = await writer.submit([{"name": "A"}])
+
+        self.assertIn(job.status, ("pending", "writing"))
+        self.assertEqual(written, [])
+
+        gate.set()
+        done = await writer.wait(job.id)
+
+        self.assertEqual(done.status, "done")
+        self.assertEqual(done.csv_path, "/tmp/candidates.csv")
+        self.assertEqual(done.to_dict()["count"], 1)
+        await writer.stop()
+
+    async def test_queued_jobs_share_one_write(self):
+        """Test queued searches are written once, and the older ones say so"""
+        gate = threading.Event()
+        written = []
+
+        def write(items):
+            gate.wait(5)
+            written.append(items[0]["name"])
+            return "path"
+
+        writer = CsvWriter(write_fn=write, max_batch=10)
+        first = await writer.submit([{"name": "first"}])
+        await asyncio.sleep(0.05)  # first job is now in flight
+        jobs = [await writer.submit([{"name": f"n{i}"}]) for i in range(3)]
+        gate.set()
+        await writer.stop()
+
+        self.assertEqual(written, ["first", "n2"])
+        self.assertEqual(first.batch_size, 1)
+        self.assertTrue(all(j.batch_size == 3 for j in jobs))
+        self.assertEqual([j.status for j in jobs], ["superseded", "superseded", "done"])
+        self.assertEqual([j.csv_path for j in jobs], [None, None, "path"])
+
+    async def test_durable_jobs_are_never_superseded(self):
+        """Test a durable job in a batch still gets its own write"""
+        gate = threading.Event()
+        written = []
+
+        def write(items):
+            gate.wait(5)
+            written.append(items[0]["name"])
+            return f"path-{items[0]['name']}"
+
+        writer = CsvWriter(write_fn=write, max_batch=10)
+        await writer.submit([{"name": "first"}])
+        await asyncio.sleep(0.05)
+        kept = await writer.submit([{"name": "kept"}], durable=True)
+        dropped = await writer.submit([{"name": "dropped"}])
+        newest = await writer.submit([{"name": "newest"}])
+        gate.set()
+        done = await writer.wait(kept.id)
+        await writer.stop()
+
+        self.assertEqual(written, ["first", "kept", "newest"])
+        self.assertEqual((done.status, done.csv_path), ("done", "path-kept"))
+        self.assertEqual((dropped.status, dropped.csv_path), ("superseded", None))
+        self.assertEqual(newest.status, "done")
+
+    async def test_failed_write_is_reported(self):
+        """Test write errors surface on the job instead of the request"""
+        def broken(items):
+            raise OSError("disk full")
+
+        writer = CsvWriter(write_fn=broken)
+        job = await writer.submit([{"name": "A"}])
+        await writer.wait(job.id)
+
+        self.assertEqual(writer.get(job.id).status, "failed")
+        self.assertIn("disk full", writer.get(job.id).error)
+        await writer.stop()
+
+    async def test_failed_batch_fails_every_job(self):
+        """Test a failed batch write is reported on all jobs it covered"""
+        gate = threading.Event()
+
+        def broken(items):
+            gate.wait(5)
+            raise OSError("disk full")
+
+        writer = CsvWriter(write_fn=broken, max_batch=10)
+        await writer.submit([{"name": "first"}])
+        await asyncio.sleep(0.05)
+        jobs = [await writer.submit([{"name": f"n{i}"}]) for i in range(2)]
+        gate.set()
+        await writer.stop()
+
+        self.assertTrue(all(j.status == "failed" and "disk full" in j.error for j in jobs))
+        self.assertTrue(all(j.csv_path is None for j in jobs))
+
+    async def test_unknown_job(self):
+        """Test lookups of unknown write ids"""
+        writer = CsvWriter(write_fn=lambda items: "path")
+
+        self.assertIsNone(writer.get("missing"))
+
+
+
+class TestBackups(unittest.TestCase):
+
+    def test_each_write_keeps_its_own_backup(self):
+        """Test rapid writes never overwrite each other's backups"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch("backend.app.storage.repository.data_dir", return_value=tmp):
+            for i in range(4):
+                save_candidates_csv([{"name": f"n{i}", "tier": "A", "score": i}])
+            backups = [f for f in os.listdir(tmp) if f.startswith("candidates_backup_")]
+
+        self.assertEqual(len(backups), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,6 @@ import asyncio
 import sys
 import os
 import json
-import pandas as pd
 sys.path.append('backend')
 
 from backend.app.clients.harvest_client import HarvestClient
@@ -72,6 +71,7 @@ async def validate_system():
     
     # Verify CSV
     if os.path.exists(csv_path):
+        import pandas as pd  # only needed for this check
         df = pd.read_csv(csv_path)
         print(f"   ✅ CSV contains {len(df)} rows")
         print(f"   📋 Columns: {list(df.columns)}")
@@ -80,7 +80,7 @@ async def validate_system():
     print("\n4. Running unit tests...")
     import subprocess
     
-    test_files = ['tests.test_normalize', 'tests.test_scoring', 'tests.test_utils']
+    test_files = ['tests.test_normalize', 'tests.test_scoring', 'tests.test_utils', 'tests.test_startup']
     all_passed = True
     
     for test_file in test_files: